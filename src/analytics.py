@@ -0,0 +1,219 @@
+"""session log analytics
+
+streams every daily session log (the YYYY-MM-DD.jsonl logs and the older YYYY-MM-DD.json ones),
+one pass per file in fixed-size chunks, and aggregates them with numpy: sessions per day and per
+hour, score distributions and quantiles of median_time_per_question. memory stays bounded however
+many months of logs there are
+
+usage: python src/analytics.py [--logs DIR [DIR ...]] [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--output report.json]
+"""
+import os
+import re
+import sys
+import json
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# sessions parsed before they are aggregated
+CHUNK_SIZE = 4096
+
+# median_time_per_question is logged with millisecond precision, so a millisecond histogram
+# gives exact quantiles in bounded memory; slower sessions share the last bucket
+TIME_RESOLUTION = 0.001
+MAX_TRACKED_TIME = 120.0
+TIME_BINS = int(round(MAX_TRACKED_TIME / TIME_RESOLUTION))
+
+QUANTILES = (0.25, 0.5, 0.75, 0.9, 0.99)
+
+LOG_NAME = re.compile(r"^(\d{4}-\d{2}-\d{2})\.jsonl?$")
+
+class SessionStats:
+    """running aggregates of a set of sessions"""
+
+    def __init__(self):
+        self.sessions = 0
+        self.score_total = 0
+        self.hours = np.zeros(24, dtype=np.int64)
+        self.scores = np.zeros(21, dtype=np.int64)
+        self.times = np.zeros(TIME_BINS + 1, dtype=np.int64)
+
+    def add(self, hours, scores, times):
+        """add a chunk of sessions, given as equally long numpy arrays (time nan when not logged)"""
+        self.sessions += len(scores)
+        self.score_total += int(scores.sum())
+        self.hours += np.bincount(hours, minlength=24)[:24]
+        self._add_scores(np.bincount(scores))
+
+        logged = times[~np.isnan(times)]
+        buckets = np.minimum(np.rint(logged / TIME_RESOLUTION).astype(np.int64), TIME_BINS)
+        self.times += np.bincount(buckets, minlength=TIME_BINS + 1)
+
+    def _add_scores(self, counts):
+        if len(counts) > len(self.scores):
+            self.scores = np.concatenate([self.scores, np.zeros(len(counts) - len(self.scores), dtype=np.int64)])
+        self.scores[:len(counts)] += counts
+
+    def merge(self, other):
+        self.sessions += other.sessions
+        self.score_total += other.score_total
+        self.hours += other.hours
+        self._add_scores(other.scores)
+        self.times += other.times
+
+    def timeQuantiles(self):
+        """nearest-rank quantiles of median_time_per_question, in seconds"""
+        cumulative = np.cumsum(self.times)
+        total = int(cumulative[-1])
+        if total == 0:
+            return {f"p{int(q * 100)}": None for q in QUANTILES}
+
+        ranks = np.maximum(np.ceil(np.array(QUANTILES) * total), 1)
+        buckets = np.searchsorted(cumulative, ranks)
+        return {f"p{int(q * 100)}": round(float(bucket * TIME_RESOLUTION), 3) for q, bucket in zip(QUANTILES, buckets)}
+
+    def toDict(self):
+        last_score = int(np.flatnonzero(self.scores)[-1]) if self.scores.any() else 0
+        return {
+            "sessions": self.sessions,
+            "mean_score": round(self.score_total / self.sessions, 3) if self.sessions else None,
+            "score_distribution": {str(score): int(count) for score, count in enumerate(self.scores[:last_score + 1])},
+            "median_time_per_question": self.timeQuantiles(),
+            "sessions_per_hour": {f"{hour:02d}": int(count) for hour, count in enumerate(self.hours) if count}
+        }
+
+def iter_records(path):
+    """the session records of one log file, read as a stream for the jsonl logs"""
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        return
+
+    # the older logs are one json document per day
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"skipping {path}: {e}", file=sys.stderr)
+        return
+    yield from (data if isinstance(data, list) else data.get("sessions", []))
+
+def iter_chunks(paths, chunk_size=CHUNK_SIZE):
+    """(hours, scores, times) arrays of up to chunk_size sessions, the buffers are reused between chunks"""
+    hours = np.empty(chunk_size, dtype=np.int64)
+    scores = np.empty(chunk_size, dtype=np.int64)
+    times = np.empty(chunk_size, dtype=np.float64)
+    count = 0
+
+    for path in paths:
+        for record in iter_records(path):
+            try:
+                hour = int(record["time"][:2])
+                score = int(record["score"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not 0 <= hour < 24 or score < 0:
+                continue
+
+            median_time = record.get("median_time_per_question")
+            hours[count] = hour
+            scores[count] = score
+            times[count] = float(median_time) if isinstance(median_time, (int, float)) else np.nan
+            count += 1
+
+            if count == chunk_size:
+                yield hours, scores, times
+                count = 0
+
+    if count:
+        yield hours[:count], scores[:count], times[:count]
+
+def find_logs(logs_dirs, first_day=None, last_day=None):
+    """day -> log files of that day, across every logs directory (one per kiosk, for instance)"""
+    days = {}
+    for logs_dir in logs_dirs:
+        if not os.path.isdir(logs_dir):
+            print(f"logs directory not found: {logs_dir}", file=sys.stderr)
+            continue
+        with os.scandir(logs_dir) as entries:
+            for entry in entries:
+                match = LOG_NAME.match(entry.name)
+                if not match or not entry.is_file():
+                    continue
+                day = match.group(1)
+                if (first_day and day < first_day) or (last_day and day > last_day):
+                    continue
+                days.setdefault(day, []).append(entry.path)
+    return dict(sorted(days.items()))
+
+def analyze(logs_dirs, first_day=None, last_day=None, chunk_size=CHUNK_SIZE):
+    """aggregate the logs, only one day's statistics are held in memory at a time"""
+    overall = SessionStats()
+    days = {}
+
+    for day, paths in find_logs(logs_dirs, first_day, last_day).items():
+        day_stats = SessionStats()
+        for hours, scores, times in iter_chunks(paths, chunk_size):
+            day_stats.add(hours, scores, times)
+
+        if day_stats.sessions:
+            days[day] = day_stats.toDict()
+            overall.merge(day_stats)
+
+    return {"overall": overall.toDict(), "days": days}
+
+def print_report(report):
+    overall = report["overall"]
+    print(f"{overall['sessions']} sessions over {len(report['days'])} days, mean score {overall['mean_score']}")
+
+    if overall["sessions"]:
+        quantiles = "  ".join(f"{name} {value}s" for name, value in overall["median_time_per_question"].items())
+        print(f"median time per question: {quantiles}")
+
+    print("\nsessions per day")
+    for day, summary in report["days"].items():
+        print(f"  {day}  {summary['sessions']:6d}  mean score {summary['mean_score']:6.2f}  "
+              f"p50 time {summary['median_time_per_question']['p50']}")
+
+    print("\nsessions per hour")
+    for hour, count in overall["sessions_per_hour"].items():
+        print(f"  {hour}h  {count}")
+
+    print("\nscore distribution")
+    for score, count in overall["score_distribution"].items():
+        print(f"  {score:>3}  {count}")
+
+def main():
+    if np is None:
+        print("analytics needs numpy: pip install numpy", file=sys.stderr)
+        sys.exit(1)
+
+    # the default logs directory is the game's
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from utils.logger import get_logs_dir
+
+    parser = argparse.ArgumentParser(description="summarize the quiz session logs")
+    parser.add_argument("--logs", nargs="+", default=[get_logs_dir()], help="logs directories, e.g. one per kiosk")
+    parser.add_argument("--from", dest="first_day", help="first day to include (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="last_day", help="last day to include (YYYY-MM-DD)")
+    parser.add_argument("--output", help="also write the full report as json")
+    args = parser.parse_args()
+
+    report = analyze(args.logs, args.first_day, args.last_day)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nanalytics report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""headless frame-time benchmark
+
+runs the game without a display, drives every state through scripted key presses and
+writes per-state handleEvents/update/draw timings to a json report
+
+usage: python src/benchmark.py [--output report.json] [--sessions 1] [--max-frames 20000]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+
+# must be set before pygame opens a display, so it runs on machines without one
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+# asset paths in config are relative to the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASES = ("handleEvents", "update", "draw")
+
+# keys pressed in turn, one press every KEY_INTERVAL frames
+SCRIPTED_KEYS = (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4)
+KEY_INTERVAL = 45
+
+def percentile_summary(samples):
+    """p50/p95/p99 and friends of a list of samples, in milliseconds"""
+    if not samples:
+        return None
+
+    ms = [sample * 1000.0 for sample in samples]
+    if len(ms) > 1:
+        cuts = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ms[0]
+
+    return {
+        "count": len(ms),
+        "mean": round(statistics.fmean(ms), 4),
+        "p50": round(p50, 4),
+        "p95": round(p95, 4),
+        "p99": round(p99, 4),
+        "max": round(max(ms), 4)
+    }
+
+class StateRecord:
+    """raw per-frame measurements for one state"""
+
+    def __init__(self):
+        self.times = {phase: [] for phase in PHASES}
+        self.frame_times = []
+        self.allocated_blocks = []
+        self.frames_over_budget = 0
+
+    def summary(self, frame_budget):
+        allocations = self.allocated_blocks
+        return {
+            "frames": len(self.frame_times),
+            "frames_over_budget": self.frames_over_budget,
+            "frame_budget_ms": round(frame_budget * 1000.0, 4),
+            "frame": percentile_summary(self.frame_times),
+            "phases": {phase: percentile_summary(self.times[phase]) for phase in PHASES},
+            "allocated_blocks": {
+                "total": sum(allocations),
+                "mean_per_frame": round(statistics.fmean(allocations), 2) if allocations else 0,
+                "max_per_frame": max(allocations) if allocations else 0
+            }
+        }
+
+def _post_key(key):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+    pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode="", scancode=0))
+
+def _count_new_blocks(before):
+    """python heap blocks allocated since before, never negative"""
+    return max(0, sys.getallocatedblocks() - before)
+
+def run_benchmark(sessions=1, max_frames=20000, seed=0):
+    """play the given number of full sessions and return the report"""
+    from config import FRAMERATE
+    from game import Game
+
+    random.seed(seed)
+
+    game = Game()
+    dt = game.scheduler.step
+    frame_budget = 1.0 / FRAMERATE
+
+    records = {}
+    completed_sessions = 0
+    previous_state = None
+    frame = 0
+
+    timer = time.perf_counter
+
+    while frame < max_frames and completed_sessions < sessions:
+        if frame % KEY_INTERVAL == 0:
+            _post_key(SCRIPTED_KEYS[(frame // KEY_INTERVAL) % len(SCRIPTED_KEYS)])
+
+        state = game.stateManager.current_state
+        state_name = type(state).__name__
+        record = records.setdefault(state_name, StateRecord())
+
+        blocks_before = sys.getallocatedblocks()
+
+        start = timer()
+        game.handleEvents(dt)
+        after_events = timer()
+        game.update(dt)
+        after_update = timer()
+        game.draw(dt)
+        end = timer()
+
+        record.allocated_blocks.append(_count_new_blocks(blocks_before))
+        record.times["handleEvents"].append(after_events - start)
+        record.times["update"].append(after_update - after_events)
+        record.times["draw"].append(end - after_update)
+        record.frame_times.append(end - start)
+        if end - start > frame_budget:
+            record.frames_over_budget += 1
+
+        # a session ends when the game over screen hands back to the start screen
+        current_name = type(game.stateManager.current_state).__name__
+        if previous_state == "GameoverState" and current_name == "StartingState":
+            completed_sessions += 1
+        previous_state = current_name
+
+        frame += 1
+
+    # the seen questions are written before the temporary logs directory goes away
+    game.quizManager.shutdown()
+
+    return {
+        "benchmark": "frame_times",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(str(part) for part in pygame.get_sdl_version()),
+            "platform": platform.platform(),
+            "video_driver": os.environ.get("SDL_VIDEODRIVER")
+        },
+        "settings": {
+            "sessions": sessions,
+            "completed_sessions": completed_sessions,
+            "max_frames": max_frames,
+            "seed": seed,
+            "timestep": dt
+        },
+        "frames": frame,
+        "states": {name: record.summary(frame_budget) for name, record in records.items()}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="headless frame-time benchmark for every game state")
+    parser.add_argument("--output", default="benchmark_report.json", help="where to write the json report")
+    parser.add_argument("--sessions", type=int, default=1, help="how many full quiz sessions to play")
+    parser.add_argument("--max-frames", type=int, default=20000, help="stop after this many frames")
+    parser.add_argument("--seed", type=int, default=0, help="seed for question selection")
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+
+    os.chdir(PROJECT_ROOT)
+    sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+    # keep benchmark sessions out of the kiosk logs
+    logs_dir = tempfile.TemporaryDirectory(prefix="quiz-benchmark-logs-")
+    os.environ["QUIZ_LOGS_DIR"] = logs_dir.name
+
+    pygame.init()
+    try:
+        report = run_benchmark(args.sessions, args.max_frames, args.seed)
+    finally:
+        from utils.logger import shutdown_logging
+        from utils.telemetry import shutdown_telemetry
+        shutdown_logging()
+        shutdown_telemetry()
+        pygame.quit()
+        logs_dir.cleanup()
+
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=4)
+
+    for name, summary in report["states"].items():
+        frame_stats = summary["frame"]
+        print(f"{name}: {summary['frames']} frames, p50 {frame_stats['p50']} ms, "
+              f"p95 {frame_stats['p95']} ms, p99 {frame_stats['p99']} ms")
+    print(f"benchmark report written to {output_path}")
+
+if __name__ == "__main__":
+    main()
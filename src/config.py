@@ -7,16 +7,66 @@ WINDOW_HEIGHT = 1080
 # game settings
 FRAMERATE = 60
 
+# rate of the fixed timestep used by state updates
+UPDATE_RATE = 60
+
+# pace frames to the display refresh instead of the framerate cap
+VSYNC = False
+
+# only repaint the screen regions that changed between frames
+DIRTY_RECT_RENDERING = True
+
 # font path
 DEFAULT_FONT_PATH = "assets/fonts/main_font.ttf"
 
+# seconds per frame spent rasterizing the question glyphs into the fonts until all of them are cached
+FONT_WARMUP_BUDGET = 0.002
+
 # questions path
 QUESTIONS_PATH = "data/questions.json"
 
+# spread each session's questions evenly over the themes instead of sampling the whole bank
+BALANCE_QUESTION_THEMES = True
+
+# fixed number of questions per theme, e.g. {"hardware": 2, "redes": 3}, overrides the balancing
+QUESTION_THEME_QUOTAS = None
+
+# don't repeat questions across sessions until all of them were shown (remembered beside the logs)
+NON_REPEATING_QUESTIONS = True
+
 # images path
 
 IMAGES_PATH = "assets/images/"
 
+# index of the theme images (rebuild with python src/utils/asset_manifest.py)
+ASSET_MANIFEST_PATH = "assets/images/manifest.json"
+
+# sizes and mtimes of the images the manifest was last verified against, in the background
+ASSET_MANIFEST_STATS_PATH = "cache/manifest_stats.json"
+
+# force the session log to disk every this many sessions, 0 leaves it to the os
+LOG_FSYNC_EVERY = 0
+
+# sessions waiting for the log writer thread, more are dropped (and counted) instead of waiting
+LOG_QUEUE_SIZE = 256
+
+# record every answer (question, shown option order, choice, time) in logs/telemetry/
+TELEMETRY_ENABLED = True
+TELEMETRY_QUEUE_SIZE = 1024
+
+# load theme images when a question first needs them instead of all of them at boot
+LAZY_IMAGE_LOADING = True
+
+# memory kept for decoded theme images in lazy mode, least recently used ones are dropped first
+IMAGE_MEMORY_BUDGET = 32 * 1024 * 1024
+
+# size of the question image box, theme images are scaled to it once and cached on disk
+QUESTION_IMAGE_SIZE = (WINDOW_WIDTH // 3, WINDOW_HEIGHT // 3)
+
+# decoded pixels cache, skips jpeg decoding and scaling on later boots
+PIXEL_CACHE_ENABLED = True
+PIXEL_CACHE_PATH = "cache/pixels/"
+
 #colors
 BLUE = (0, 144, 211)
 DARK_BLUE = (19, 80, 132)
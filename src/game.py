@@ -2,17 +2,26 @@ import pygame
 from config import *
 from states import *
 from quiz_manager import QuizManager
+from utils.frame_scheduler import FrameScheduler
+from utils.profiler import profiler
+from utils.logger import shutdown_logging
+from utils.telemetry import shutdown_telemetry
+from utils.font_manager import fonts
 del GameState
 
 class Game:
     def __init__(self):
         self.windowRes = (WINDOW_WIDTH, WINDOW_HEIGHT)
-        self.screen = pygame.display.set_mode(self.windowRes)
+        self.vsync = VSYNC
+        self.screen = self._create_display()
         pygame.display.set_caption("QUIZ INFORMÁTICA")
 
-        self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(FRAMERATE, UPDATE_RATE, self.vsync)
         self.running = True
 
+        # measured duration of the last frame, in seconds
+        self.frame_time = 0.0
+
         self.quizManager = QuizManager(QUESTIONS_PATH)
 
         self.stateManager = StateManager(self)
@@ -25,6 +34,16 @@ class Game:
 
         self.score = 0
 
+    def _create_display(self):
+        if self.vsync:
+            try:
+                # vsync needs a renderer backed display
+                return pygame.display.set_mode(self.windowRes, pygame.SCALED, vsync=1)
+            except pygame.error as e:
+                print(f"vsync not available, falling back to the frame cap: {e}")
+                self.vsync = False
+        return pygame.display.set_mode(self.windowRes)
+
     def handleEvents(self, dt):
         events = pygame.event.get()
 
@@ -39,22 +58,41 @@ class Game:
 
     def draw(self, dt):
         
-        self.stateManager.draw(dt, self.screen)
+        dirty_rects = self.stateManager.draw(dt, self.screen)
 
-        pygame.display.flip()
-        pygame.time.Clock().tick(FRAMERATE)
+        overlay_rect = profiler.drawOverlay(self.screen)
+        if overlay_rect and dirty_rects is not None:
+            dirty_rects.append(overlay_rect)
 
-    def run(self):
-        clock = pygame.time.Clock()
-
-        while self.running:
-
-            dt = clock.tick(FRAMERATE) / 1000.0  
-            
-            self.handleEvents(dt)
-            
-            self.update(dt)
-            
-            self.draw(dt)
-            
+        start = profiler.begin()
+        if dirty_rects is None:
             pygame.display.flip()
+        elif dirty_rects:
+            pygame.display.update(dirty_rects)
+        profiler.end("flip", start)
+
+        # once per frame, however many update steps it ran: a slice of the glyph warm-up
+        fonts.update()
+
+    def run(self):
+        try:
+            while self.running:
+
+                # the only clock tick of the frame
+                self.frame_time = self.scheduler.tick()
+                
+                self.handleEvents(self.frame_time)
+                
+                # game logic advances in fixed steps, independent of how long frames take
+                for dt in self.scheduler.steps():
+                    self.update(dt)
+                
+                self.draw(self.frame_time)
+
+                profiler.endFrame()
+        finally:
+            # a crash or ctrl-c is when the profile matters most, so it is written first
+            profiler.dump()
+            self.quizManager.shutdown()
+            shutdown_logging()
+            shutdown_telemetry()
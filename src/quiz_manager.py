@@ -1,33 +1,66 @@
 import random
 import os
 import pygame
-from config import IMAGES_PATH
-from utils.file_utils import load_json_file
-from utils.image_utils import load_image, preload_images_by_theme, get_random_image_for_theme
-from utils.quiz_utils import select_random_questions, get_fallback_question
+from collections import OrderedDict
+from config import (IMAGES_PATH, ASSET_MANIFEST_PATH, ASSET_MANIFEST_STATS_PATH, LAZY_IMAGE_LOADING, IMAGE_MEMORY_BUDGET, QUESTION_IMAGE_SIZE,
+                    PIXEL_CACHE_ENABLED, PIXEL_CACHE_PATH, BALANCE_QUESTION_THEMES, QUESTION_THEME_QUOTAS,
+                    NON_REPEATING_QUESTIONS)
+from utils.image_utils import load_image, get_random_image_for_theme
+from utils.asset_manifest import (load_or_build_manifest, rebuild_manifest, verify_manifest, theme_image_paths,
+                                  load_verified_stats, save_verified_stats)
+from utils.asset_loader import AssetLoader
+from utils.question_bank import load_question_bank
+from utils.question_scheduler import QuestionScheduler
+from utils.pixel_cache import PixelCache, display_pixel_format
+from utils.telemetry import new_session_id
+from utils.font_manager import fonts
+from utils.quiz_utils import select_random_questions, select_stratified_questions, get_fallback_question
 
 class QuizManager:
     def __init__(self, questions_file_path):
         self.questions = []
         self.all_questions = []  # store all available questions
+        self.theme_index = {}  # theme -> positions of its questions in all_questions
+        self.question_ids = []  # position in all_questions -> stable question id
+        self.bank_charset = ""  # characters of every question, stored in the compiled bank
+        self.scheduler = None  # remembers served questions across sessions
+        self.session_id = None  # ties the answers of a session together in the telemetry
         self.current_index = 0
         self.score = 0
         self.total_questions = 10
         self.max_question_time = 60.0
         self.questions_file_path = questions_file_path  # store the path for later reloading
         
-        # map of theme folders and their available image counts
+        # map of theme folders and their image paths, from the asset manifest
+        self.manifest = None
         self.theme_images = self._load_theme_images()
         
-        # image cache
-        self.image_cache = {}
+        # image cache (images ready for drawing), in least recently used order
+        self.image_cache = OrderedDict()
+        self.image_cache_bytes = 0
         
-        # theme image dictionary
+        # lazy mode loads images on first use and keeps them under a memory budget
+        self.lazy_images = LAZY_IMAGE_LOADING
+        self.image_memory_budget = IMAGE_MEMORY_BUDGET if LAZY_IMAGE_LOADING else None
+        
+        # theme image dictionary (theme -> image paths)
         self.theme_image_dict = {}
         
+        # images are decoded in the background so the first frame isn't held up
+        self.placeholder_path = os.path.join(IMAGES_PATH, "placeholder.png")
+        self.pixel_cache = PixelCache(PIXEL_CACHE_PATH, display_pixel_format()) if PIXEL_CACHE_ENABLED else None
+        self.image_loader = AssetLoader(self._decode_image)
+        
         # preload all images and organize them by theme
         self._preload_all_images()
         
+        # both stat every image, so they happen on the loader thread after the preloads
+        if self.manifest is not None:
+            self.image_loader.runWhenIdle(self._verifyManifest)
+        if self.pixel_cache is not None:
+            # entries of edited, replaced or removed images would otherwise stay on disk forever
+            self.image_loader.runWhenIdle(self._prunePixelCache)
+        
         # load questions
         self.loadQuestions(questions_file_path)
     
@@ -40,46 +73,88 @@ class QuizManager:
             if not os.path.exists(IMAGES_PATH):
                 print(f"warning: images path {IMAGES_PATH} does not exist")
                 return theme_images
-                
-            # get all theme folders in the images directory
-            theme_folders = [f for f in os.listdir(IMAGES_PATH) 
-                             if os.path.isdir(os.path.join(IMAGES_PATH, f))]
             
-            # count the numbered images
-            for theme_folder in theme_folders:
-                folder_path = os.path.join(IMAGES_PATH, theme_folder)
-                
-                # find the highest numbered image in the format
-                image_count = 0
-                for i in range(1, 21):  # assume maximum of 20 images per theme
-                    if os.path.exists(os.path.join(folder_path, f"{i}.jpg")):
-                        image_count = i
-                    else:
-                        break
-                
-                # store the count of images for this theme
-                if image_count > 0:
-                    theme_images[theme_folder] = image_count
-                    print(f"found {image_count} images for theme '{theme_folder}'")
+            self.manifest = load_or_build_manifest(IMAGES_PATH, ASSET_MANIFEST_PATH)
+            theme_images = theme_image_paths(self.manifest, IMAGES_PATH)
+            
+            for theme_folder, paths in theme_images.items():
+                print(f"found {len(paths)} images for theme '{theme_folder}'")
         
         except Exception as e:
             print(f"error loading theme images: {e}")
         
         return theme_images
     
+    def _verifyManifest(self):
+        """rebuild the manifest when the image folders changed since it was written (loader thread)"""
+        up_to_date, stats = verify_manifest(self.manifest, IMAGES_PATH, load_verified_stats(ASSET_MANIFEST_STATS_PATH))
+        if not up_to_date:
+            print(f"asset manifest {ASSET_MANIFEST_PATH} is out of date, rebuilding it")
+            self.manifest = rebuild_manifest(IMAGES_PATH, ASSET_MANIFEST_PATH)
+            up_to_date, stats = verify_manifest(self.manifest, IMAGES_PATH)
+
+            # new dicts, the main thread may be reading the old ones; new images are loaded on first use
+            theme_images = theme_image_paths(self.manifest, IMAGES_PATH)
+            theme_image_dict = {theme: list(paths) for theme, paths in theme_images.items()}
+            theme_image_dict["default"] = [self.placeholder_path]
+            self.theme_images = theme_images
+            self.theme_image_dict = theme_image_dict
+
+        if up_to_date:
+            save_verified_stats(stats, ASSET_MANIFEST_STATS_PATH)
+
+    def _prunePixelCache(self):
+        live_entries = [(path, QUESTION_IMAGE_SIZE) for paths in self.theme_images.values() for path in paths]
+        self.pixel_cache.prune(live_entries)
+
     def _preload_all_images(self):
-        """preload all possible theme images into memory"""
-        placeholder_path = os.path.join(IMAGES_PATH, "placeholder.png")
-        self.image_cache, self.theme_image_dict = preload_images_by_theme(
-            self.theme_images, 
-            IMAGES_PATH, 
-            placeholder_path
-        )
-        print(f"preloaded {len(self.image_cache)} images into {len(self.theme_image_dict)} themes")
+        """queue all possible theme images for background loading"""
+        # the placeholder is the fallback for everything else, so it is loaded right away
+        self.placeholder_image = load_image(self.placeholder_path)
+        self.image_cache[self.placeholder_path] = self.placeholder_image
+        
+        self.theme_image_dict = {theme: list(paths) for theme, paths in self.theme_images.items()}
+        self.theme_image_dict["default"] = [self.placeholder_path]
+        
+        if self.lazy_images:
+            print(f"found {len(self.theme_image_dict)} themes, images will be loaded on first use")
+            return
+        
+        for theme, paths in self.theme_image_dict.items():
+            for path in paths:
+                if path not in self.image_cache:
+                    self.image_loader.request(path)
+        
+        finished, requested = self.image_loader.progress()
+        print(f"loading {requested} images for {len(self.theme_image_dict)} themes in the background")
+    
+    def _decode_image(self, path):
+        """decode a theme image at the question image size, through the pixel cache when enabled"""
+        if self.pixel_cache is None:
+            return pygame.image.load(path)
+        return self.pixel_cache.loadScaled(path, QUESTION_IMAGE_SIZE)
     
-    def _get_random_image_for_theme(self, theme):
-        """get a random image for the given theme"""
-        return get_random_image_for_theme(self.theme_image_dict, theme)
+    def getLoadingProgress(self):
+        """fraction of the images queued at boot that finished loading, lazy mode queues none"""
+        if self.lazy_images:
+            return 1.0
+        finished, requested = self.image_loader.progress()
+        return finished / requested if requested else 1.0
+    
+    def _get_image_path(self, question):
+        """pick the image of a question once, so it can be prefetched before it is shown"""
+        if 'image_path' not in question:
+            question['image_path'] = get_random_image_for_theme(self.theme_image_dict, question['theme'])
+        return question['image_path']
+    
+    def _prefetch_image(self, index):
+        """start decoding the image of the question at index in the background"""
+        if index >= len(self.questions) or 'theme' not in self.questions[index]:
+            return
+        
+        path = self._get_image_path(self.questions[index])
+        if path not in self.image_cache:
+            self.image_loader.request(path, urgent=True)
     
     def get_cached_image(self, image_or_path):
         """get an image from the cache or return the image if it's already a surface"""
@@ -88,30 +163,118 @@ class QuizManager:
             return image_or_path
             
         if image_or_path in self.image_cache:
+            self.image_cache.move_to_end(image_or_path)
             return self.image_cache[image_or_path]
         
-        # if image somehow isnt in cache load it now
-        placeholder_path = os.path.join(IMAGES_PATH, "placeholder.png")
-        try:
-            img = pygame.image.load(image_or_path)
-            self.image_cache[image_or_path] = img
-            return img
-        except Exception:
-            return self.image_cache[placeholder_path]
+        img = self.image_loader.take(image_or_path)
+        
+        if img is None and not self.lazy_images and self.image_loader.isKnown(image_or_path):
+            # still loading (or failed), show the placeholder for now
+            self.image_loader.request(image_or_path, urgent=True)
+            return self.placeholder_image
+        
+        if img is None and self.image_loader.isKnown(image_or_path):
+            if self.image_loader.hasFailed(image_or_path):
+                return self.placeholder_image
+            # the prefetch is still running, finishing it is quicker than decoding the image twice
+            self.image_loader.request(image_or_path, urgent=True)
+            img = self.image_loader.wait(image_or_path)
+        
+        if img is None:
+            # not prefetched (or somehow not in cache), load it now
+            try:
+                img = self._decode_image(image_or_path)
+            except Exception:
+                return self.placeholder_image
+        
+        # converting needs the display, so it happens here on the main thread
+        img = img.convert_alpha() if img.get_alpha() else img.convert()
+        self._cache_image(image_or_path, img)
+        return img
+    
+    def _cache_image(self, path, img):
+        self.image_cache[path] = img
+        self.image_cache_bytes += img.get_pitch() * img.get_height()
+        
+        if self.image_memory_budget is None:
+            return
+        
+        # drop the least recently used images, never the placeholder or the one just added
+        for old_path in list(self.image_cache):
+            if self.image_cache_bytes <= self.image_memory_budget:
+                break
+            if old_path in (self.placeholder_path, path):
+                continue
+            old_img = self.image_cache.pop(old_path)
+            self.image_cache_bytes -= old_img.get_pitch() * old_img.get_height()
+    
+    def shutdown(self):
+        """stop the background loader and write the seen questions"""
+        self.image_loader.stop()
+        if self.scheduler is not None:
+            self.scheduler.stop()
         
     def loadQuestions(self, file_path):
-        data = load_json_file(file_path)
-        if data:
-            self.all_questions = data.get('questions', [])
-            self._selectRandomQuestions()
+        # questions come validated and normalized from the compiled bank next to the json
+        bank = load_question_bank(os.path.splitext(file_path)[0] + ".qbank", file_path)
+        if bank and len(bank):
+            self.all_questions = bank.questions
+            self.theme_index = bank.themes
+            self.question_ids = bank.ids
         else:
             # Use fallback question
             self.all_questions = [get_fallback_question()]
-            self._selectRandomQuestions()
+            self.theme_index = {'default': [0]}
+            self.question_ids = [0]
+        
+        # have the glyphs of every question ready before any is shown, the bank stores its
+        # characters so none of its questions has to be decoded for this
+        self.bank_charset = bank.charset if bank else ""
+        if self.bank_charset:
+            fonts.addCharacters(self.bank_charset)
+        
+        if NON_REPEATING_QUESTIONS:
+            self.scheduler = QuestionScheduler(self.question_ids)
+            self.scheduler.preparePools(self._selectionPools())
+        
+        # every session picks again on reset, so this first pick isn't remembered
+        self._selectRandomQuestions(remember=False)
 
-    def _selectRandomQuestions(self):
+    @staticmethod
+    def _questionTexts(questions):
+        for question in questions:
+            yield question['text']
+            yield from question['options']
+    
+    def _selectionPools(self):
+        """theme -> question ids the sessions are drawn from, the whole bank is one pool when not balancing"""
+        if BALANCE_QUESTION_THEMES or QUESTION_THEME_QUOTAS:
+            return self.theme_index
+        return {'*': range(len(self.all_questions))}
+
+    def _selectRandomQuestions(self, remember=True):
         """select a random set of questions from all available questions"""
-        self.questions = select_random_questions(self.all_questions, self.total_questions)
+        scheduler = self.scheduler if remember else None
+        self.session_id = new_session_id()
+        pools = self._selectionPools()
+        
+        if BALANCE_QUESTION_THEMES or QUESTION_THEME_QUOTAS:
+            self.questions = select_stratified_questions(self.all_questions, pools, self.total_questions,
+                                                         quotas=QUESTION_THEME_QUOTAS, normalize=False,
+                                                         pick=scheduler.pick if scheduler else None)
+        elif scheduler is not None:
+            self.questions = select_stratified_questions(self.all_questions, pools, self.total_questions,
+                                                         quotas={'*': self.total_questions}, normalize=False,
+                                                         pick=scheduler.pick)
+        else:
+            self.questions = select_random_questions(self.all_questions, self.total_questions, normalize=False)
+        
+        if not self.bank_charset:
+            # no charset from the bank, at least the session's questions are warmed up
+            fonts.warmup(self._questionTexts(self.questions))
+        
+        if scheduler is not None:
+            scheduler.save()
         self.current_index = 0
         self.score = 0
     
@@ -122,10 +285,11 @@ class QuizManager:
         question = self.questions[self.current_index]
         
         if 'image' not in question and 'theme' in question:
-            theme = question['theme']
-
-            image = self._get_random_image_for_theme(theme)
+            image = self.get_cached_image(self._get_image_path(question))
             question['image'] = image
+            
+            # decode the next question's image while this one is on screen
+            self._prefetch_image(self.current_index + 1)
         
         return question
     
@@ -147,5 +311,9 @@ class QuizManager:
         self.current_index = 0
         self.score = 0
         
+        if self.lazy_images:
+            # prefetched images of the last session that were never shown are outside the memory budget
+            self.image_loader.discard()
+        
         # select a new set of random questions
         self._selectRandomQuestions()
\ No newline at end of file
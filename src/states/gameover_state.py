@@ -4,13 +4,15 @@ from config import *
 from ui import *
 from utils import ease_in_out
 from utils.animation import Animation
+from utils.profiler import profiler
 from utils.logger import log_quiz_data
+from utils.font_manager import get_font
 
 class GameoverState(GameState):
     def __init__(self, game):
         super().__init__(game)
-        self.scoreLabel_font = pygame.font.Font(DEFAULT_FONT_PATH, 80)
-        self.default_font = pygame.font.Font(DEFAULT_FONT_PATH, 130)
+        self.scoreLabel_font = get_font(80)
+        self.default_font = get_font(130)
         
         self.circleRadius = 0
         self.foregroundOpacity = 0
@@ -50,6 +52,16 @@ class GameoverState(GameState):
         self.foreground_animation = Animation(0, 255, 0.5)
         self.auto_transition_timer = 0
 
+        self.widgets = [
+            self.fireImage,
+            self.scoreLabel,
+            self.scoreValueLabel
+        ]
+
+        # what was on screen last frame, to know which regions changed
+        self.drawnCircleRadius = 0
+        self.drawnForegroundOpacity = 0
+
     def handle_events(self, events, delta_time):
         self.current_events = events
         for event in events:
@@ -116,10 +128,33 @@ class GameoverState(GameState):
                 question_times = quiz_state.question_times
 
         # log quiz data
-        log_quiz_data(self.game.score, self.game.quizManager.total_questions, question_times)
+        log_quiz_data(self.game.score, self.game.quizManager.total_questions, question_times,
+                      self.game.quizManager.session_id)
+
+    def _circle_rect(self, radius):
+        """bounding rect of the background circle for the given radius"""
+        rect = pygame.Rect(0, 0, radius * 2 + 2, radius * 2 + 2)
+        rect.center = (int(WINDOW_WIDTH * 0.5), int(WINDOW_HEIGHT * 0.45))
+        return rect
+
+    def getDirtyRects(self):
+        rects = super().getDirtyRects()
+
+        circleRadius = int(self.circleRadius)
+        if circleRadius != self.drawnCircleRadius and rects is not None:
+            rects.append(self._circle_rect(max(circleRadius, self.drawnCircleRadius)))
+        self.drawnCircleRadius = circleRadius
+
+        # the foreground fade covers the whole screen
+        foregroundChanged = self.foregroundOpacity != self.drawnForegroundOpacity
+        self.drawnForegroundOpacity = self.foregroundOpacity
+        if foregroundChanged or self.foregroundOpacity > 0:
+            return None
+
+        return rects
 
-    def draw(self, delta_time, screen):
-        self.game.screen.fill(DARK_BLUE)
+    def drawScene(self, delta_time, screen):
+        screen.fill(DARK_BLUE)
         
         pygame.draw.circle(screen, WHITE, (int(WINDOW_WIDTH * 0.5), int(WINDOW_HEIGHT * 0.45)), int(self.circleRadius))
 
@@ -130,6 +165,7 @@ class GameoverState(GameState):
         self.fireImage.draw(screen)
 
         if self.foregroundOpacity > 0:
+            profiler.count("surfaces_allocated")
             foreground_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
             foreground_color = (*DARK_BLUE[:3], self.foregroundOpacity)
             foreground_surface.fill(foreground_color)
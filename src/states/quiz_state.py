@@ -3,13 +3,16 @@ from states import GameState
 from config import *
 from ui import *
 from utils.animation import Animation
+from utils.profiler import profiler
+from utils.font_manager import get_font
+from utils.telemetry import record_answer, TIMED_OUT
 import os
 
 class QuizState(GameState):
     def __init__(self, game):
         super().__init__(game)
-        self.progress_font = pygame.font.Font(DEFAULT_FONT_PATH, 60)
-        self.default_font = pygame.font.Font(DEFAULT_FONT_PATH, 70)
+        self.progress_font = get_font(60)
+        self.default_font = get_font(70)
         
         self.isQuizOver = False
 
@@ -41,12 +44,12 @@ class QuizState(GameState):
                             text=f" 0/{self.game.quizManager.total_questions}",
                             font=self.progress_font,
                             text_color=WHITE,
-                            anchor="midtop"
+                            anchor="midtop",
+                            glyph_atlas=True
                             )
         
         # image dimensions
-        image_width = WINDOW_WIDTH // 3
-        image_height = WINDOW_HEIGHT // 3
+        image_width, image_height = QUESTION_IMAGE_SIZE
         
         # create question image object
         self.questionImage = Image(
@@ -71,7 +74,7 @@ class QuizState(GameState):
 
         # buttons
         b_border_radius = 10
-        b_font = pygame.font.Font(DEFAULT_FONT_PATH, 30)
+        b_font = get_font(30)
         b_dimensions = (WINDOW_WIDTH // 2.3, WINDOW_HEIGHT // 8)
         b_anchor = "midtop"
 
@@ -164,11 +167,28 @@ class QuizState(GameState):
         
         # create a surface to use for fading
         self.transition_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+        
+        # region of the transition surface in use and the widget revisions it was built from
+        self.transitionSurfaceRect = pygame.Rect(0, 0, 0, 0)
+        self.transitionSurfaceRevisions = None
 
         self.buttons_interactive = True
 
         self.question_times = []  # tracks the time spent on each question
 
+        # elements that fade together during question transitions
+        self.question_widgets = [
+            self.questionLabel,
+            self.questionImage,
+            *self.option_buttons
+        ]
+
+        self.widgets = [self.progressLabel, *self.question_widgets]
+
+        # what was on screen last frame, to know which regions changed
+        self.drawnTransition = (False, 255)
+        self.drawnForegroundOpacity = 0
+
     def _load_current_question(self):
         question = self.game.quizManager.getCurrentQuestion()
         
@@ -202,13 +222,14 @@ class QuizState(GameState):
         # get the image from the question
         image = question.get('image')
         
-        # load question image if available
+        # load question image if available, its opacity is driven by questionImage_animation
+        # and the question layer fades, so the image's own fade would fight them
         if image:
-            self.questionImage.setImage(image, animate=True)
+            self.questionImage.setImage(image, animate=False)
         else:
             # set to a default placeholder if somehow missing
             default_path = os.path.join(IMAGES_PATH, "placeholder.png")
-            self.questionImage.setPath(default_path, animate=True)
+            self.questionImage.setPath(default_path, animate=False)
         
         # update progress display
         self.progressLabel.setText(f" {self.game.quizManager.current_index + 1}/{self.game.quizManager.total_questions}")
@@ -226,6 +247,8 @@ class QuizState(GameState):
         self.question_times.append(self.question_timer)
         
         correct = self.game.quizManager.checkAnswer(selected_index)
+        record_answer(self.game.quizManager.session_id, self.game.quizManager.getCurrentQuestion(),
+                      selected_index, correct, self.question_timer)
 
         if correct:
             self.game.score += 1
@@ -284,6 +307,8 @@ class QuizState(GameState):
             # check if the question timer has reached the maximum time
             if self.question_timer >= self.game.quizManager.max_question_time:
                 self.timing_out = True
+                record_answer(self.game.quizManager.session_id, self.game.quizManager.getCurrentQuestion(),
+                              TIMED_OUT, False, self.question_timer)
                 self.foreground_animation.reset()
                 
         if self.timing_out:
@@ -314,7 +339,7 @@ class QuizState(GameState):
         
         # update feedback timer
         if self.showing_feedback and self.feedback_timer > 0:
-            self.feedback_timer -= 1/FRAMERATE
+            self.feedback_timer -= delta_time
             
             if self.feedback_timer <= 0:
                 self._next_question()
@@ -402,31 +427,57 @@ class QuizState(GameState):
 
         self.foregroundOpacity = 0
 
-    def draw(self, delta_time, screen):
-        self.game.screen.fill(DARK_BLUE)
+    def getDirtyRects(self):
+        rects = super().getDirtyRects()
+
+        # a change in the question fade repaints the question elements
+        transition = (self.transitioning, self.question_transition_opacity)
+        if transition != self.drawnTransition and rects is not None:
+            rects.extend(widget.rect for widget in self.question_widgets if widget.rect)
+        self.drawnTransition = transition
+
+        # the foreground fade covers the whole screen
+        foregroundChanged = self.foregroundOpacity != self.drawnForegroundOpacity
+        self.drawnForegroundOpacity = self.foregroundOpacity
+        if foregroundChanged or self.foregroundOpacity > 0:
+            return None
+
+        return rects
+
+    def _update_transition_surface(self):
+        """redraw the question elements into the transition surface when any of them changed"""
+        revisions = tuple(widget.revision for widget in self.question_widgets)
+        if revisions == self.transitionSurfaceRevisions:
+            return
+
+        # only the previously used region can hold stale pixels
+        self.transition_surface.fill((0, 0, 0, 0), self.transitionSurfaceRect)
+
+        for widget in self.question_widgets:
+            widget.draw(self.transition_surface)
+
+        rects = [widget.rect for widget in self.question_widgets if widget.rect]
+        self.transitionSurfaceRect = rects[0].unionall(rects[1:]).clip(self.transition_surface.get_rect())
+        self.transitionSurfaceRevisions = revisions
+
+    def drawScene(self, delta_time, screen):
+        screen.fill(DARK_BLUE)
         
         # draw progress
         self.progressLabel.draw(screen)
         
-        if not self.transitioning or self.question_transition_opacity > 0:
+        if self.transitioning and self.question_transition_opacity > 0:
             # draw all elements that should fade with the transition
-            
-            fade_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-            
-            self.questionLabel.draw(fade_surface)
-            self.questionImage.draw(fade_surface)
-            
-            for button in self.option_buttons:
-                button.draw(fade_surface)
-
-            if self.transitioning:
-
-                fade_surface.set_alpha(self.question_transition_opacity)
-                
+            self._update_transition_surface()
 
-            screen.blit(fade_surface, (0, 0))
+            self.transition_surface.set_alpha(self.question_transition_opacity)
+            screen.blit(self.transition_surface, self.transitionSurfaceRect, self.transitionSurfaceRect)
+        elif not self.transitioning:
+            for widget in self.question_widgets:
+                widget.draw(screen)
         
         if self.foregroundOpacity > 0:
+            profiler.count("surfaces_allocated")
             foreground_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
             foreground_color = (*DARK_BLUE[:3], self.foregroundOpacity)
             foreground_surface.fill(foreground_color)
@@ -3,6 +3,10 @@ from states import GameState
 from config import *
 from ui import *
 from utils.animation import Animation
+from utils.profiler import profiler
+from utils.font_manager import get_font
+
+PROMPT_TEXT = "Pressione um botão para começar"
 
 class StartingState(GameState):
     def __init__(self, game):
@@ -10,16 +14,17 @@ class StartingState(GameState):
 
         self.startingQuiz = False
 
-        self.default_font = pygame.font.Font(DEFAULT_FONT_PATH, 120)
-        self.pressioneBotao_font = pygame.font.Font(DEFAULT_FONT_PATH, 50)
-        self.credits_font = pygame.font.Font(DEFAULT_FONT_PATH, 30)
+        self.default_font = get_font(120)
+        self.pressioneBotao_font = get_font(50)
+        self.credits_font = get_font(30)
 
         self.foregroundOpacity = 0
 
         self.miguelistaImage = Image(
                             pos=(WINDOW_WIDTH // 2, int(WINDOW_HEIGHT * 0.1)),
                             image_path=IMAGES_PATH + "miguelista.png",
-                            scale=0
+                            scale=0,
+                            scale_animation=True
         )
 
         self.quizLabel = Label(
@@ -55,7 +60,7 @@ class StartingState(GameState):
 
         self.pressioneBotaoLabel = Label(
                             pos=(WINDOW_WIDTH // 2, int(WINDOW_HEIGHT * 0.9)),
-                            text="Pressione um botão para começar",
+                            text=PROMPT_TEXT,
                             font=self.pressioneBotao_font
         )
 
@@ -84,11 +89,25 @@ class StartingState(GameState):
 
         self.current_events = []
 
+        self.widgets = [
+            self.miguelistaImage,
+            self.quizLabel,
+            self.informaticaLabel,
+            self.fireImage,
+            self.pressioneBotaoLabel,
+            self.creditsLabel
+        ]
+
+        # what was on screen last frame, to know which regions changed
+        self.drawnFireBox = self.fireBox.copy()
+        self.drawnForegroundOpacity = 0
+
     def handle_events(self, events, delta_time):
         self.current_events = events
         for event in events:
             if event.type == pygame.KEYDOWN:
-                if self.pressioneBotaoLabel_animation.is_complete:
+                # the quiz waits for the theme images, so it never opens on placeholders
+                if self.pressioneBotaoLabel_animation.is_complete and self.game.quizManager.getLoadingProgress() >= 1.0:
                     self.startingQuiz = True
 
     def update(self, delta_time):
@@ -132,6 +151,13 @@ class StartingState(GameState):
                 pressione_botao_opacity = int(self.pressioneBotaoLabel_animation.update(delta_time))
                 self.pressioneBotaoLabel.setOpacity(pressione_botao_opacity)
 
+            # the prompt shows the loading progress until the images loaded at boot are ready
+            progress = self.game.quizManager.getLoadingProgress()
+            if progress < 1.0:
+                self.pressioneBotaoLabel.setText(f"A carregar imagens... {int(progress * 100)}%")
+            else:
+                self.pressioneBotaoLabel.setText(PROMPT_TEXT)
+
             # credits label animation
             credits_opacity = int(self.creditsLabel_animation.update(delta_time))
             self.creditsLabel.setOpacity(credits_opacity)
@@ -161,8 +187,24 @@ class StartingState(GameState):
         self.creditsLabel.setOpacity(0)
         self.foregroundOpacity = 0
 
-    def draw(self, delta_time, screen):
-        self.game.screen.fill(DARK_BLUE)
+    def getDirtyRects(self):
+        rects = super().getDirtyRects()
+
+        fireBoxChanged = self.fireBox != self.drawnFireBox
+        if fireBoxChanged and rects is not None:
+            rects.extend([self.drawnFireBox, self.fireBox.copy()])
+        self.drawnFireBox = self.fireBox.copy()
+
+        # the foreground fade covers the whole screen
+        foregroundChanged = self.foregroundOpacity != self.drawnForegroundOpacity
+        self.drawnForegroundOpacity = self.foregroundOpacity
+        if foregroundChanged or self.foregroundOpacity > 0:
+            return None
+
+        return rects
+
+    def drawScene(self, delta_time, screen):
+        screen.fill(DARK_BLUE)
 
         self.quizLabel.draw(screen)
         self.informaticaLabel.draw(screen)
@@ -179,6 +221,7 @@ class StartingState(GameState):
         self.creditsLabel.draw(screen)
 
         if self.foregroundOpacity > 0:
+            profiler.count("surfaces_allocated")
             foreground_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
             foreground_color = (*DARK_BLUE[:3], self.foregroundOpacity)
             foreground_surface.fill(foreground_color)
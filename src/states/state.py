@@ -1,8 +1,13 @@
 import pygame
+from config import DIRTY_RECT_RENDERING
 
 class GameState:
     def __init__(self, game):
         self.game = game
+
+        # widgets whose changed regions are collected every frame
+        self.widgets = []
+        self.full_redraw = True
     
     def handle_events(self, events):
         pass
@@ -11,7 +16,59 @@ class GameState:
         pass
         
     def draw(self, delta_time, screen):
+        """draw the state and return the updated rects (None when the whole screen was repainted)"""
+        dirty_rects = self.getDirtyRects()
+
+        if dirty_rects is None:
+            self.drawScene(delta_time, screen)
+            self.full_redraw = False
+            return None
+
+        screen_rect = screen.get_rect()
+        dirty_rects = self._merge_rects([rect.clip(screen_rect) for rect in dirty_rects])
+
+        # repaint the whole scene clipped to each changed region
+        for rect in dirty_rects:
+            screen.set_clip(rect)
+            self.drawScene(delta_time, screen)
+        screen.set_clip(None)
+
+        return dirty_rects
+
+    def drawScene(self, delta_time, screen):
+        """draw every element of the state, the screen may be clipped to a dirty region"""
         pass
+
+    def getDirtyRects(self):
+        """collect the regions changed since the last frame, None means repaint the whole screen"""
+        rects = []
+        for widget in self.widgets:
+            rects.extend(widget.getDirtyRects())
+
+        if self.full_redraw or not DIRTY_RECT_RENDERING:
+            return None
+        
+        return rects
+
+    def requestFullRedraw(self):
+        """repaint the whole screen on the next frame"""
+        self.full_redraw = True
+
+    def _merge_rects(self, rects):
+        """merge overlapping rects so no region is repainted twice"""
+        merged = []
+        for rect in rects:
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+
+            for i, other in enumerate(merged):
+                if other.colliderect(rect):
+                    merged[i] = other.union(rect)
+                    break
+            else:
+                merged.append(rect)
+        
+        return merged
         
     def enter(self):
         """called when this state becomes the active state"""
@@ -19,4 +76,4 @@ class GameState:
         
     def exit(self):
         """called when this state is no longer the active state"""
-        pass
\ No newline at end of file
+        pass
@@ -1,3 +1,5 @@
+from utils.profiler import profiler
+
 class StateManager:
     def __init__(self, game):
         self.game = game
@@ -14,6 +16,8 @@ class StateManager:
             if self.current_state:
                 self.current_state.exit()
             self.current_state = self.states[state_id]
+            profiler.setState(type(self.current_state).__name__)
+            self.current_state.requestFullRedraw()
             self.current_state.enter()
         else:
             print(f"state {state_id} not found!")
@@ -21,14 +25,22 @@ class StateManager:
     def handleEvents(self, events, delta_time):
         """handle events in the current state"""
         if self.current_state:
+            start = profiler.begin()
             self.current_state.handle_events(events, delta_time)
+            profiler.end("handleEvents", start)
             
     def update(self, delta_time):
         """update the current state"""
         if self.current_state:
+            start = profiler.begin()
             self.current_state.update(delta_time)
+            profiler.end("update", start)
             
     def draw(self, delta_time, screen):
-        """draw the current state"""
+        """draw the current state, returns the updated rects or None for the whole screen"""
         if self.current_state:
-            self.current_state.draw(delta_time, screen)
\ No newline at end of file
+            start = profiler.begin()
+            dirty_rects = self.current_state.draw(delta_time, screen)
+            profiler.end("draw", start)
+            return dirty_rects
+        return None
\ No newline at end of file
@@ -1,5 +1,6 @@
 # makes the 'ui' directory a python package
 
+from .widget import Widget
 from .label import Label
 from .button import Button
 from .image import Image
\ No newline at end of file
@@ -1,9 +1,12 @@
 import pygame
+from utils.text_cache import render_text
+from .widget import Widget
 
-class Button:
+class Button(Widget):
     def __init__(self, pos, action=None, text="", font=None, text_color=(255, 255, 255), 
                  bg_color=None, padding=(0, 0), border_radius=5, sound=None, key=None, 
                  width=None, height=None, anchor="center"):
+        super().__init__()
         
         self.action = action
         self.clicked = False
@@ -40,52 +43,21 @@ class Button:
         self.enabled = True
         
     def _update_text_surfaces(self):
-        """create text surfaces with word wrapping if fixed width is provided."""
-        font_height = self.font.get_height()
-        
+        """create the text surface with word wrapping if fixed width is provided."""
         if self.fixed_width is None:
             # no word wrapping needed
-            self.text_surfaces = [self.font.render(self.text, True, self.text_color)]
-            text_width = self.text_surfaces[0].get_width()
+            self.text_surface = render_text(self.font, self.text, self.text_color)
             
-            self.visual_width = text_width + self.padding[0] * 2
-            self.visual_height = font_height + self.padding[1] * 2
+            self.visual_width = self.text_surface.get_width() + self.padding[0] * 2
+            self.visual_height = self.font.get_height() + self.padding[1] * 2
         else:
             # apply word wrapping for fixed width
             max_text_width = self.fixed_width - (self.padding[0] * 2)
-            
-            # create wrapped text
-            self.text_surfaces = []
-            words = self.text.split()
-            current_line = ""
-            
-            for word in words:
-                test_line = current_line + word + " " if current_line else word + " "
-                test_surface = self.font.render(test_line.strip(), True, self.text_color)
-                
-                if test_surface.get_width() <= max_text_width:
-                    current_line = test_line
-                else:
-                    # line is full, render it and start a new line
-                    if current_line:
-                        self.text_surfaces.append(self.font.render(current_line.strip(), True, self.text_color))
-                    current_line = word + " "
-            
-            # add the last line if it's not empty
-            if current_line:
-                self.text_surfaces.append(self.font.render(current_line.strip(), True, self.text_color))
-            
-            # if no fixed_width provided text or failed to wrap, create at least one surface
-            if not self.text_surfaces:
-                self.text_surfaces = [self.font.render(self.text, True, self.text_color)]
-            
-            # calculate the widest text surface
-            max_surface_width = max([surf.get_width() for surf in self.text_surfaces])
+            self.text_surface = render_text(self.font, self.text, self.text_color, wrap_width=max_text_width)
             
             self.visual_width = self.fixed_width
             # height depends on number of lines
-            total_text_height = len(self.text_surfaces) * font_height
-            self.visual_height = total_text_height + self.padding[1] * 2
+            self.visual_height = self.text_surface.get_height() + self.padding[1] * 2
         
         # override with fixed height if provided and larger than calculated height
         if self.fixed_height is not None and self.fixed_height > self.visual_height:
@@ -107,11 +79,15 @@ class Button:
             b = b1 + (b2 - b1) * self.transition_progress
             
             # Update the current background color
-            self.bg_color = (int(r), int(g), int(b))
+            new_bg_color = (int(r), int(g), int(b))
+            if new_bg_color != self.bg_color:
+                self.bg_color = new_bg_color
+                self.markDirty()
         else:
             if self.bg_color != self.target_bg_color:
                 self.bg_color = self.target_bg_color
                 self.starting_bg_color = self.bg_color
+                self.markDirty()
 
         if showingFeedback or imageAnimating:
             if hasattr(self, 'is_pressed') and self.is_pressed:
@@ -144,17 +120,10 @@ class Button:
         # draw background if there is one and it's not transparent
         pygame.draw.rect(surface, self.bg_color, self.visual_rect, border_radius=self.border_radius)
         
-        # calculate starting Y position to center text block vertically
-        font_height = self.font.get_height()
-        total_text_height = len(self.text_surfaces) * font_height
-        start_y = self.visual_rect.centery - (total_text_height // 2)
-        
-        # draw each line of text
-        for i, text_surf in enumerate(self.text_surfaces):
-            # center each line horizontally
-            text_rect = text_surf.get_rect(centerx=self.visual_rect.centerx)
-            text_rect.y = start_y + (i * font_height)
-            surface.blit(text_surf, text_rect)
+        # center the text block (lines are already centered inside it)
+        text_rect = self.text_surface.get_rect(centerx=self.visual_rect.centerx)
+        text_rect.y = self.visual_rect.centery - (self.text_surface.get_height() // 2)
+        surface.blit(self.text_surface, text_rect)
 
     def getText(self):
         return self.text
@@ -176,6 +145,7 @@ class Button:
             
             # update hitbox to match new visual dimensions
             self.rect = self.visual_rect.copy()
+            self.markDirty()
     
     def setBgColor(self, color):
         """set the target background color for smooth transition"""
@@ -190,6 +160,7 @@ class Button:
         if pos != current_pos:
             setattr(self.visual_rect, self.anchor, pos)
             self.rect = self.visual_rect.copy()
+            self.markDirty()
             
     def setAnchor(self, anchor):
         """change the anchor point of the button"""
@@ -206,6 +177,7 @@ class Button:
             
             # update hitbox
             self.rect = self.visual_rect.copy()
+            self.markDirty()
 
     def resetKeyState(self):
         """reset the key state to not pressed, regardless of actual key state"""
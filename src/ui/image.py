@@ -1,10 +1,15 @@
 import pygame
 import time
+from utils.image_utils import build_mip_chain, scale_from_mip_chain
+from utils.profiler import profiler
+from utils.transform_cache import transform_image
+from .widget import Widget
 
-class Image:
+class Image(Widget):
     def __init__(self, pos, image_path, scale=1.0, fixed_width=None, fixed_height=None, 
                  preserve_aspect_ratio=True, visible=True, anchor="center", opacity=255,
-                 border_radius=0, fade_duration=0.5):
+                 border_radius=0, fade_duration=0.5, scale_animation=False):
+        super().__init__()
         
         self.pos = pos
         self.image_path = image_path
@@ -18,8 +23,14 @@ class Image:
         self.border_radius = border_radius
         self.fade_duration = fade_duration
 
+        # when the scale is animated every frame, scale from a precomputed pyramid
+        self.scale_animation = scale_animation
+        self.mip_chain = None
+
         self.original_image = None
         self.original_rect = None
+        self.processed_image = None  # scaled and rounded, before opacity
+        self.faded_image = None
         self.image = None
         self.rect = None
         
@@ -48,15 +59,18 @@ class Image:
                 self.original_image = self.original_image.convert()
             
             self.original_rect = self.original_image.get_rect()
+            self._build_mip_chain()
             self._apply_transformations()
             
         except Exception as e:
             print(f"could not load image {self.image_path}: {e}")
-            # create a placeholder for failed loads
-            self.image = pygame.Surface((100, 100))
-            self.image.fill((255, 0, 255))
-            self.rect = self.image.get_rect()
+            # create a placeholder for failed loads, faded like any other image
+            self.processed_image = pygame.Surface((100, 100))
+            self.processed_image.fill((255, 0, 255))
+            self.faded_image = None
+            self.rect = self.processed_image.get_rect()
             setattr(self.rect, self.anchor, self.pos)
+            self._apply_opacity()
 
     def _apply_transformations(self):
         if self.original_image is None:
@@ -83,64 +97,47 @@ class Image:
             new_width = int(orig_width * self.scale)
             new_height = int(orig_height * self.scale)
         
-        # create scaled image
-        if new_width > 0 and new_height > 0:
-            self.image = pygame.transform.smoothscale(self.original_image, (new_width, new_height))
+        # prevent zero-sized images
+        target_size = (new_width, new_height) if new_width > 0 and new_height > 0 else None
+        
+        if self.mip_chain and target_size and self.border_radius <= 0:
+            # animated scales change every frame, caching them would only evict useful entries
+            self.processed_image = scale_from_mip_chain(self.mip_chain, target_size)
         else:
-            # prevent zero-sized images
-            self.image = self.original_image
-            
-        # apply border radius if needed
-        if self.border_radius > 0:
-            self._apply_border_radius()
-            
-        # apply opacity if not fully opaque
-        if self.opacity < 255:
-            # create a copy that supports alpha
-            if self.image.get_alpha() is None:
-                self.image = self.image.convert_alpha()
-            
-            # set the alpha value
-            self.image.set_alpha(self.opacity)
+            # scaled and rounded image, shared through the transformation cache
+            self.processed_image = transform_image(self.original_image, target_size, self.border_radius)
+        self.faded_image = None
         
         # position the image based on anchor
-        self.rect = self.image.get_rect()
+        self.rect = self.processed_image.get_rect()
         setattr(self.rect, self.anchor, self.pos)
+
+        self._apply_opacity()
     
-    def _apply_border_radius(self):
-        """apply rounded corners to the image"""
-        if self.border_radius <= 0 or self.image is None:
-            return
-            
-        # create a surface with per-pixel alpha
-        sized_image = self.image.copy()
-        if sized_image.get_alpha() is None:
-            sized_image = sized_image.convert_alpha()
-            
-        w, h = sized_image.get_size()
-        radius = min(self.border_radius, min(w, h) // 2)  # limit radius to half of smallest dimension
-        
-        # create a mask surface with rounded corners
-        mask = pygame.Surface((w, h), pygame.SRCALPHA)
-        mask.fill((0, 0, 0, 0))  # transparent
-        
-        # draw rounded rectangle on the mask
-        pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, w, h), 
-                         border_radius=radius)
-        
-        # apply the mask to our image
-        sized_image.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
-        self.image = sized_image
+    def _build_mip_chain(self):
+        """precompute the scale pyramid used by scale animations"""
+        self.mip_chain = build_mip_chain(self.original_image) if self.scale_animation else None
 
     def _apply_opacity(self):
         """apply the current opacity to the image"""
-        if not hasattr(self, 'processed_image') or self.processed_image is None:
+        if self.processed_image is None:
             return
         
-        self.image = self.processed_image.copy()
-        
         if self.opacity < 255:
-            self.image.set_alpha(self.opacity)
+            # fade a private copy that supports alpha, the cached surface must stay untouched
+            if self.faded_image is None:
+                profiler.count("surfaces_allocated")
+                if self.processed_image.get_alpha() is None:
+                    self.faded_image = self.processed_image.convert_alpha()
+                else:
+                    self.faded_image = self.processed_image.copy()
+            
+            self.faded_image.set_alpha(self.opacity)
+            self.image = self.faded_image
+        else:
+            self.image = self.processed_image
+
+        self.markDirty()
 
     def update(self, delta_time=None):
         """update the image animation"""
@@ -155,14 +152,25 @@ class Image:
         if progress >= 1.0:
             # animation complete
             self.animating = False
-            self.opacity = self.animation_target_opacity
+            opacity = self.animation_target_opacity
         else:
             # calculate current opacity
-            self.opacity = int(self.animation_start_opacity + 
-                              (self.animation_target_opacity - self.animation_start_opacity) * progress)
+            opacity = int(self.animation_start_opacity + 
+                          (self.animation_target_opacity - self.animation_start_opacity) * progress)
         
-        # apply the current opacity
-        self._apply_opacity()
+        # only swaps the alpha of the faded copy, nothing is re-scaled
+        self.setOpacity(opacity)
+
+        if not self.animating and self.temp_image_path:
+            # the old image has faded out, fade the new one in
+            self.image_path = self.temp_image_path
+            self.temp_image_path = None
+            self._load_image()
+
+            self.animation_start_opacity = 0
+            self.animation_target_opacity = 255
+            self.animation_start_time = current_time
+            self.animating = True
 
     def setPosition(self, pos):
         """change the position of the image"""
@@ -170,6 +178,7 @@ class Image:
             self.pos = pos
             if self.rect:
                 setattr(self.rect, self.anchor, pos)
+                self.markDirty()
 
     def setAnchor(self, anchor):
         """change the anchor point"""
@@ -183,6 +192,7 @@ class Image:
             # reapply position with new anchor
             if self.rect:
                 setattr(self.rect, self.anchor, old_pos)
+                self.markDirty()
 
     def setScale(self, scale):
         if scale != self.scale:
@@ -236,42 +246,10 @@ class Image:
     def setImage(self, image_surface, animate=False):
         """set the image directly from a pygame surface"""
         self.original_image = image_surface
+        self.original_rect = image_surface.get_rect()
+        self._build_mip_chain()
         
-        # create a copy of the image to work with
-        if image_surface.get_alpha() is not None:
-            self.image = image_surface.convert_alpha().copy()
-        else:
-            self.image = image_surface.convert().copy()
-        
-        # handle image resizing
-        if self.fixed_width and self.fixed_height:
-            if self.preserve_aspect_ratio:
-                # calculate preserving aspect ratio
-                img_ratio = self.image.get_width() / self.image.get_height()
-                target_ratio = self.fixed_width / self.fixed_height
-                
-                if img_ratio > target_ratio:
-                    # image is wider than target area
-                    new_width = self.fixed_width
-                    new_height = int(new_width / img_ratio)
-                else:
-                    # image is taller than target area
-                    new_height = self.fixed_height
-                    new_width = int(new_height * img_ratio)
-                    
-                self.image = pygame.transform.smoothscale(self.image, (new_width, new_height))
-            else:
-                # scaling to fixed dimensions
-                self.image = pygame.transform.smoothscale(self.image, (self.fixed_width, self.fixed_height))
-        
-        # apply border radius if needed
-        if self.border_radius > 0:
-            self._apply_border_radius()
-        
-        self.rect = self.image.get_rect()
-        if self.rect:
-            setattr(self.rect, self.anchor, self.pos)
-        
+        # resizing and rounding happen in _apply_transformations through the cache
         if animate:
             # set up fade-in animation
             self.animating = True
@@ -295,7 +273,9 @@ class Image:
         self.fade_duration = max(0.1, duration)  # ensure minimum sensible duration
 
     def setVisibility(self, visible):
-        self.visible = visible
+        if visible != self.visible:
+            self.visible = visible
+            self.markDirty()
         
     def setOpacity(self, opacity):
         # ensure opacity is within valid range
@@ -303,7 +283,7 @@ class Image:
         
         if opacity != self.opacity:
             self.opacity = opacity
-            self._apply_transformations()
+            self._apply_opacity()
 
     def draw(self, surface):
         if self.visible and self.image and self.rect:
@@ -1,9 +1,14 @@
 import pygame
+from utils.text_cache import render_text
+from utils.glyph_atlas import get_glyph_atlas
+from utils.profiler import profiler
+from .widget import Widget
 
-class Label:
+class Label(Widget):
     def __init__(self, pos, text, font, text_color=(255, 255, 255),
                  visible=True, highlighted=False, highlight_color=None,
-                 anchor="center", opacity=255, max_width=None, padding=(0, 0)):
+                 anchor="center", opacity=255, max_width=None, padding=(0, 0), glyph_atlas=False):
+        super().__init__()
         
         self.text = text
         self.font = font
@@ -16,7 +21,10 @@ class Label:
         self.opacity = max(0, min(255, opacity))
         self.max_width = max_width
         self.padding = padding
-        self.text_surfaces = []
+        # compose digits and the like from a glyph atlas, for text that changes often (counters, timers)
+        self.glyph_atlas = glyph_atlas
+        self.base_surface = None
+        self.faded_surface = None
         
         self._update_surface()
     
@@ -25,58 +33,51 @@ class Label:
         # use highlight color if highlighted and highlight_color is set
         render_color = self.highlight_color if self.highlighted and self.highlight_color else self.text_color
         
-        font_height = self.font.get_height()
+        wrap_width = None if self.max_width is None else self.max_width - (self.padding[0] * 2)
         
-        if self.max_width is None:
-            # no word wrapping needed
-            self.text_surfaces = [self.font.render(self.text, True, render_color)]
-            text_width = self.text_surfaces[0].get_width()
-            text_height = font_height
+        atlas = get_glyph_atlas(self.font, render_color) if self.glyph_atlas and wrap_width is None else None
+        if atlas is not None and atlas.canRender(self.text):
+            # composed for this label only, these texts would just churn the shared cache
+            text_block = atlas.render(self.text)
         else:
-            max_text_width = self.max_width - (self.padding[0] * 2)
-            
-            self.text_surfaces = []
-            words = self.text.split()
-            current_line = ""
-            
-            for word in words:
-                test_line = current_line + word + " " if current_line else word + " "
-                test_surface = self.font.render(test_line.strip(), True, render_color)
-                
-                if test_surface.get_width() <= max_text_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        self.text_surfaces.append(self.font.render(current_line.strip(), True, render_color))
-                    current_line = word + " "
-            
-            if current_line:
-                self.text_surfaces.append(self.font.render(current_line.strip(), True, render_color))
-            
-            if not self.text_surfaces:
-                self.text_surfaces = [self.font.render(self.text, True, render_color)]
-            
-            text_width = max([surf.get_width() for surf in self.text_surfaces])
-            text_height = len(self.text_surfaces) * font_height
+            # the cached block is shared with other widgets and must not be modified
+            text_block = render_text(self.font, self.text, render_color, True, wrap_width)
         
-        self.text_surface = pygame.Surface((text_width + self.padding[0] * 2, 
-                                          text_height + self.padding[1] * 2), pygame.SRCALPHA)
-        self.text_surface.fill((0, 0, 0, 0))
+        if self.padding == (0, 0):
+            self.base_surface = text_block
+        else:
+            profiler.count("surfaces_allocated")
+            self.base_surface = pygame.Surface((text_block.get_width() + self.padding[0] * 2, 
+                                                text_block.get_height() + self.padding[1] * 2), pygame.SRCALPHA)
+            self.base_surface.fill((0, 0, 0, 0))
+            self.base_surface.blit(text_block, self.padding)
         
-        for i, line_surface in enumerate(self.text_surfaces):
-            line_rect = line_surface.get_rect(
-                midtop=(text_width // 2 + self.padding[0], 
-                       i * font_height + self.padding[1])
-            )
-            self.text_surface.blit(line_surface, line_rect)
+        self.faded_surface = None
+        self.text_surface = self.base_surface
         
-        if self.opacity < 255:
-            self.text_surface.set_alpha(self.opacity)
+        self._apply_opacity()
         
         self.rect = self.text_surface.get_rect()
-        
+        self._update_rect()
+
+    def _apply_opacity(self):
+        """apply the current opacity to the rendered text without rendering it again"""
+        if self.opacity < 255:
+            # fade a private copy so the cached surface stays untouched
+            if self.faded_surface is None:
+                profiler.count("surfaces_allocated")
+                self.faded_surface = self.base_surface.copy()
+            self.faded_surface.set_alpha(self.opacity)
+            self.text_surface = self.faded_surface
+        else:
+            self.text_surface = self.base_surface
+        self.markDirty()
+
+    def _update_rect(self):
+        """move the rect to the current position and anchor"""
         if self.rect is not None:
             setattr(self.rect, self.anchor, self.pos)
+        self.markDirty()
 
     def setText(self, text):
         """change the displayed text"""
@@ -94,17 +95,20 @@ class Label:
         """change the position of the label"""
         if pos != self.pos:
             self.pos = pos
-            self._update_surface()
+            self._update_rect()
 
     def setAnchor(self, anchor):
         """change the anchor point"""
         if anchor != self.anchor:
             self.anchor = anchor
-            self._update_surface()
+            self.rect = self.text_surface.get_rect()
+            self._update_rect()
     
     def setVisibility(self, visible):
         """set visibility state"""
-        self.visible = visible
+        if visible != self.visible:
+            self.visible = visible
+            self.markDirty()
 
     def setHighlighted(self, highlighted):
         """change highlighted state"""
@@ -119,7 +123,7 @@ class Label:
         
         if opacity != self.opacity:
             self.opacity = opacity
-            self._update_surface()
+            self._apply_opacity()
             
     def setMaxWidth(self, max_width):
         """set the maximum width for text wrapping"""
@@ -129,7 +133,7 @@ class Label:
 
     def draw(self, surface):
         """draw label on the given surface"""
-        if not self.visible:
+        if not self.visible or self.opacity == 0:
             return
         
         surface.blit(self.text_surface, self.rect)
@@ -0,0 +1,38 @@
+class Widget:
+    """base class for ui elements, keeps track of the screen region they changed"""
+
+    def __init__(self):
+        self.dirty = True
+        self.drawn_rect = None
+
+        # bumped on every change, lets cached composites know when to rebuild
+        self.revision = 0
+
+    def markDirty(self):
+        """flag the widget so its region is repainted on the next frame"""
+        self.dirty = True
+        self.revision += 1
+
+    def isDrawn(self):
+        """whether the widget currently puts pixels on the screen"""
+        return getattr(self, 'visible', True) and self.rect is not None
+
+    def getDirtyRects(self):
+        """return the regions changed since the last call and mark the widget clean"""
+        if not self.dirty:
+            return []
+
+        rects = []
+
+        # the area covered on the previous frame has to be repainted too
+        if self.drawn_rect is not None:
+            rects.append(self.drawn_rect)
+
+        if self.isDrawn():
+            self.drawn_rect = self.rect.copy()
+            rects.append(self.drawn_rect)
+        else:
+            self.drawn_rect = None
+
+        self.dirty = False
+        return rects
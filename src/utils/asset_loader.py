@@ -0,0 +1,146 @@
+import threading
+import pygame
+from collections import deque
+
+class AssetLoader:
+    """decodes images on a background thread into a thread-safe cache
+
+    the worker only decodes, converting to the display format needs the display and
+    happens on the main thread the first time an image is fetched. housekeeping given to
+    runWhenIdle() runs on the worker too, whenever no image is waiting
+
+    load_function(path) -> surface replaces pygame.image.load, e.g. to go through a pixel cache"""
+
+    def __init__(self, load_function=None):
+        self.load_function = load_function or pygame.image.load
+
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.queued = set()
+        self.idle_tasks = deque()
+
+        self.decoded = {}  # path -> surface straight from the decoder
+        self.failed = set()
+
+        self.requested_count = 0
+        self.finished_count = 0
+
+        # bumped by discard(), so an image decoding at that moment isn't kept either
+        self.generation = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._work, name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def request(self, path, urgent=False):
+        """queue an image for loading, urgent requests jump ahead of the queue"""
+        with self.condition:
+            if path in self.queued or path in self.decoded or path in self.failed:
+                if urgent and path in self.pending:
+                    # move it to the front
+                    self.pending.remove(path)
+                    self.pending.appendleft(path)
+                return
+
+            self.queued.add(path)
+            self.requested_count += 1
+            if urgent:
+                self.pending.appendleft(path)
+            else:
+                self.pending.append(path)
+            self.condition.notify()
+
+    def runWhenIdle(self, task):
+        """run task() on the worker once no image is waiting to be decoded"""
+        with self.condition:
+            self.idle_tasks.append(task)
+            self.condition.notify()
+
+    def get(self, path):
+        """return the decoded image if it is ready, None otherwise (never blocks)"""
+        with self.condition:
+            return self.decoded.get(path)
+
+    def take(self, path):
+        """like get, but hands the image over and forgets it, so it isn't kept in memory twice"""
+        with self.condition:
+            return self.decoded.pop(path, None)
+
+    def wait(self, path, timeout=None):
+        """take a requested image, waiting for it if it is still queued or decoding"""
+        with self.condition:
+            self.condition.wait_for(lambda: path not in self.queued or not self.running, timeout)
+            return self.decoded.pop(path, None)
+
+    def discard(self):
+        """drop the queued requests and the decoded images nobody took, failures are remembered"""
+        with self.condition:
+            for path in self.pending:
+                self.queued.discard(path)
+            self.requested_count -= len(self.pending)
+            self.pending.clear()
+            self.decoded.clear()
+            self.generation += 1
+
+    def hasFailed(self, path):
+        with self.condition:
+            return path in self.failed
+
+    def isKnown(self, path):
+        """whether the path was ever requested from this loader"""
+        with self.condition:
+            return path in self.queued or path in self.decoded or path in self.failed
+
+    def progress(self):
+        """(finished, requested) image counts"""
+        with self.condition:
+            return self.finished_count, self.requested_count
+
+    def isIdle(self):
+        with self.condition:
+            return not self.pending and self.finished_count == self.requested_count
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.pending.clear()
+            self.condition.notify()
+        self.thread.join(timeout=1.0)
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending and not self.idle_tasks:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                if not self.pending:
+                    task = self.idle_tasks.popleft()
+                    path = None
+                else:
+                    path = self.pending.popleft()
+                    generation = self.generation
+
+            if path is None:
+                try:
+                    task()
+                except Exception as e:
+                    print(f"asset loader task failed: {e}")
+                continue
+
+            # decoding runs without holding the lock
+            try:
+                image = self.load_function(path)
+            except Exception as e:
+                print(f"Error loading image {path}: {e}")
+                image = None
+
+            with self.condition:
+                self.queued.discard(path)
+                if image is None:
+                    self.failed.add(path)
+                elif generation == self.generation:
+                    self.decoded[path] = image
+                self.finished_count += 1
+                # wakes up wait()
+                self.condition.notify_all()
@@ -0,0 +1,210 @@
+"""index of the theme images, so startup reads one file instead of probing the image folders
+
+startup trusts the manifest, verify_manifest checks it against the folders later on a
+background thread
+
+usage: python src/utils/asset_manifest.py [images_path]   (rebuilds the manifest)
+"""
+import io
+import os
+import re
+import sys
+import json
+import struct
+import hashlib
+import pygame
+
+MANIFEST_VERSION = 1
+MANIFEST_FILENAME = "manifest.json"
+
+# file extension -> format name
+IMAGE_FORMATS = {
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".png": "png",
+    ".bmp": "bmp",
+    ".gif": "gif",
+    ".webp": "webp"
+}
+
+def _natural_key(name):
+    """sort 2.jpg before 10.jpg"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+def _jpeg_size(data):
+    """size from the first start-of-frame segment"""
+    position = 2
+    while position + 9 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            # fill byte
+            position += 1
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack_from(">HH", data, position + 5)
+            return width, height
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7:
+            # markers without a length
+            position += 2
+            continue
+        position += 2 + struct.unpack_from(">H", data, position + 2)[0]
+    return None
+
+def _header_size(data, image_format):
+    """width and height read from the file header, None when the header isn't understood"""
+    if image_format == "png" and data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+        return struct.unpack_from(">II", data, 16)
+    if image_format == "jpeg" and data[:2] == b"\xff\xd8":
+        return _jpeg_size(data)
+    if image_format == "gif" and data[:3] == b"GIF" and len(data) >= 10:
+        return struct.unpack_from("<HH", data, 6)
+    if image_format == "bmp" and data[:2] == b"BM" and len(data) >= 26 and struct.unpack_from("<I", data, 14)[0] >= 40:
+        width, height = struct.unpack_from("<ii", data, 18)
+        return width, abs(height)
+    return None
+
+def _image_entry(images_path, theme, filename, image_format):
+    full_path = os.path.join(images_path, theme, filename)
+    with open(full_path, "rb") as f:
+        data = f.read()
+
+    size = _header_size(data, image_format)
+    if size is None:
+        # decoding from memory avoids reading the file a second time
+        size = pygame.image.load(io.BytesIO(data), filename).get_size()
+    width, height = size
+
+    return {
+        "path": f"{theme}/{filename}",
+        "theme": theme,
+        "format": image_format,
+        "width": width,
+        "height": height,
+        "bytes": len(data),
+        "sha1": hashlib.sha1(data).hexdigest()
+    }
+
+def list_images(images_path):
+    """(theme, filename, format, bytes, mtime in ns) of every image in the theme folders, in manifest order"""
+    images = []
+
+    with os.scandir(images_path) as folders:
+        themes = sorted((entry.name for entry in folders if entry.is_dir()), key=_natural_key)
+
+    for theme in themes:
+        with os.scandir(os.path.join(images_path, theme)) as files:
+            entries = sorted((entry for entry in files if entry.is_file()), key=lambda entry: _natural_key(entry.name))
+
+        for entry in entries:
+            image_format = IMAGE_FORMATS.get(os.path.splitext(entry.name)[1].lower())
+            if image_format is not None:
+                stat = entry.stat()
+                images.append((theme, entry.name, image_format, stat.st_size, stat.st_mtime_ns))
+
+    return images
+
+def build_manifest(images_path):
+    """scan every theme folder once and describe each image in it"""
+    images = []
+
+    for theme, filename, image_format, _, _ in list_images(images_path):
+        try:
+            images.append(_image_entry(images_path, theme, filename, image_format))
+        except Exception as e:
+            print(f"skipping image {theme}/{filename}: {e}")
+
+    return {"version": MANIFEST_VERSION, "images": images}
+
+def verify_manifest(manifest, images_path, verified=None):
+    """check the manifest against the image folders, returns (up to date, stats); it stats every
+    image, so it is meant for a background thread
+
+    stats maps each image path to its [bytes, mtime] and can be passed back as verified by the
+    next check: files that didn't change since are trusted, the others are hashed and compared
+    with the manifest, so an image replaced by one of the same size is noticed too"""
+    verified = verified or {}
+    images = list_images(images_path)
+    if [entry["path"] for entry in manifest["images"]] != [f"{theme}/{filename}" for theme, filename, *_ in images]:
+        return False, {}
+
+    stats = {}
+    for entry, (theme, filename, _, size, mtime) in zip(manifest["images"], images):
+        if entry["bytes"] != size:
+            return False, {}
+        if verified.get(entry["path"]) != [size, mtime]:
+            with open(os.path.join(images_path, theme, filename), "rb") as f:
+                if hashlib.sha1(f.read()).hexdigest() != entry["sha1"]:
+                    return False, {}
+        stats[entry["path"]] = [size, mtime]
+
+    return True, stats
+
+def save_manifest(manifest, manifest_path):
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+
+def load_manifest(manifest_path):
+    """read the manifest, None if it is missing, unreadable or from another version"""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def load_or_build_manifest(images_path, manifest_path=None):
+    """the shipped manifest, or a fresh scan when there is none (saved for the next start if possible)"""
+    if manifest_path is None:
+        manifest_path = os.path.join(images_path, MANIFEST_FILENAME)
+
+    manifest = load_manifest(manifest_path)
+    if manifest is not None:
+        return manifest
+
+    print(f"asset manifest {manifest_path} not found, scanning {images_path}")
+    return rebuild_manifest(images_path, manifest_path)
+
+def rebuild_manifest(images_path, manifest_path):
+    """scan the image folders and save the manifest if possible"""
+    manifest = build_manifest(images_path)
+    try:
+        save_manifest(manifest, manifest_path)
+    except OSError as e:
+        print(f"could not save asset manifest: {e}")
+    return manifest
+
+def load_verified_stats(path):
+    """the stats of the last successful verify_manifest, empty if there are none"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return stats if isinstance(stats, dict) else {}
+
+def save_verified_stats(stats, path):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f)
+
+def theme_image_paths(manifest, images_path):
+    """theme -> image paths, in manifest order"""
+    theme_paths = {}
+    for entry in manifest["images"]:
+        theme_paths.setdefault(entry["theme"], []).append(os.path.join(images_path, *entry["path"].split("/")))
+    return theme_paths
+
+if __name__ == "__main__":
+    base_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "assets", "images")
+    output_path = os.path.join(base_path, MANIFEST_FILENAME)
+
+    save_manifest(build_manifest(base_path), output_path)
+    print(f"asset manifest written to {output_path}")
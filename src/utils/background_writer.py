@@ -0,0 +1,88 @@
+import threading
+from collections import deque
+
+class BackgroundWriter:
+    """hands records to a writer thread through a bounded queue, so disk i/o never holds up a frame
+
+    write_batch(records) runs on the writer thread with up to batch_size records at a time. when
+    the queue is full new records are dropped and counted instead of blocking the caller. the
+    thread starts with the first record and stop() writes whatever is still queued"""
+
+    def __init__(self, write_batch, max_queue=256, batch_size=64, name="background-writer"):
+        self.write_batch = write_batch
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.name = name
+
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.thread = None
+        self.running = False
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, record):
+        """queue a record, returns False if it had to be dropped (never blocks)"""
+        with self.condition:
+            if len(self.pending) >= self.max_queue:
+                self.dropped += 1
+                return False
+
+            self.pending.append(record)
+            if self.thread is None:
+                self.running = True
+                self.thread = threading.Thread(target=self._work, name=self.name, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+            return True
+
+    def stats(self):
+        with self.condition:
+            return {
+                "queued": len(self.pending),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed
+            }
+
+    def stop(self, timeout=2.0):
+        """flush the queue and stop the thread, returns False if it didn't finish in time"""
+        with self.condition:
+            thread = self.thread
+            self.running = False
+            self.condition.notify()
+
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                return False
+
+        with self.condition:
+            self.thread = None
+            if self.dropped or self.failed:
+                print(f"{self.name}: {self.dropped} records dropped, {self.failed} failed to write")
+        return True
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.pending:
+                    # stopped and everything is written
+                    return
+                batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+
+            # writing runs without holding the lock
+            try:
+                self.write_batch(batch)
+                written, failed = len(batch), 0
+            except Exception as e:
+                print(f"{self.name}: could not write {len(batch)} records: {e}")
+                written, failed = 0, len(batch)
+
+            with self.condition:
+                self.written += written
+                self.failed += failed
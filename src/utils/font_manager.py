@@ -0,0 +1,85 @@
+import time
+import threading
+import pygame
+from config import DEFAULT_FONT_PATH, FONT_WARMUP_BUDGET
+from utils.profiler import profiler
+
+# characters rasterized per render call, a chunk of the largest font takes under 2 ms
+WARMUP_CHUNK = 4
+
+class FontManager:
+    """loads every (path, size) once and shares the font with every state and widget
+
+    warmup() and addCharacters() collect the characters to have ready, update() then rasterizes
+    them into the fonts on the main thread (fonts aren't thread safe), a few characters at a
+    time until the frame's budget is spent, so accented glyphs are already cached when a
+    question shows up without any frame taking the whole cost"""
+
+    def __init__(self, budget=FONT_WARMUP_BUDGET):
+        self.fonts = {}
+        self.lock = threading.Lock()
+        self.budget = budget
+
+        self.charset = set()  # characters collected for warming up
+        self.warmed = {}      # (path, size) -> characters already rasterized
+        self.needs_warmup = False
+
+    def get(self, size, path=None):
+        key = (path or DEFAULT_FONT_PATH, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(*key)
+            self.warmed[key] = set()
+            self.needs_warmup = bool(self.charset)
+            profiler.count("fonts_loaded")
+        return font
+
+    def addCharacters(self, characters):
+        """have these characters rasterized, e.g. the charset stored in the question bank"""
+        with self.lock:
+            # a new set, update() may be reading the old one
+            self.charset = self.charset | {c for c in characters if c.isprintable()}
+            self.needs_warmup = True
+
+    def warmup(self, texts):
+        """collect the characters of texts (any iterable of strings, it is consumed on a background thread)"""
+        def collect():
+            characters = set()
+            for text in texts:
+                characters.update(text)
+            self.addCharacters(characters)
+
+        threading.Thread(target=collect, name="font-warmup", daemon=True).start()
+
+    def update(self):
+        """rasterize missing characters for at most the budget, call once per frame"""
+        if not self.needs_warmup:
+            return
+
+        with self.lock:
+            charset = self.charset
+
+        deadline = time.perf_counter() + self.budget
+        for key, font in self.fonts.items():
+            warmed = self.warmed[key]
+            missing = sorted(charset - warmed)
+            for start in range(0, len(missing), WARMUP_CHUNK):
+                chunk = missing[start:start + WARMUP_CHUNK]
+                font.render("".join(chunk), True, (255, 255, 255))
+                warmed.update(chunk)
+                profiler.count("font_warmups")
+                if time.perf_counter() >= deadline:
+                    # carry on next frame
+                    return
+
+        with self.lock:
+            # characters added meanwhile wait for the next call
+            if self.charset is charset:
+                self.needs_warmup = False
+
+# process-wide font registry
+fonts = FontManager()
+
+def get_font(size, path=None):
+    """the shared font of the given size (default font unless a path is given)"""
+    return fonts.get(size, path)
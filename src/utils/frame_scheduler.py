@@ -0,0 +1,55 @@
+import pygame
+
+class FrameScheduler:
+    """ticks the clock once per frame and hands out fixed update timesteps
+
+    drawing is deliberately step-locked: a frame shows the state after its last update, nothing
+    is interpolated between steps. to keep frames from running 0 or 2 updates when the update
+    rate matches the framerate, frame times within snap_tolerance of a whole number of steps
+    count as exactly that many steps"""
+
+    def __init__(self, framerate, update_rate=None, vsync=False, max_steps=5, snap_tolerance=0.002):
+        self.clock = pygame.time.Clock()
+        self.framerate = framerate
+        self.vsync = vsync
+
+        # length of one update step in seconds
+        self.step = 1.0 / (update_rate or framerate)
+
+        # cap on the backlog of steps, so one long stall doesn't cause a burst of updates
+        self.max_steps = max_steps
+
+        # clock jitter in seconds absorbed by snapping, 0 disables it
+        self.snap_tolerance = snap_tolerance
+
+        self.accumulator = 0.0
+        self.frame_time = 0.0
+
+    def tick(self):
+        """wait for the next frame and return the measured frame time in seconds"""
+        if self.vsync:
+            # the display flip already paces the loop, the clock only measures
+            elapsed_ms = self.clock.tick()
+        else:
+            elapsed_ms = self.clock.tick(self.framerate)
+
+        self.frame_time = elapsed_ms / 1000.0
+        self.accumulator = min(self.accumulator + self._snap(self.frame_time), self.step * self.max_steps)
+
+        return self.frame_time
+
+    def steps(self):
+        """yield a fixed timestep for every step the accumulated frame time pays for"""
+        while self.accumulator >= self.step:
+            self.accumulator -= self.step
+            yield self.step
+
+    def _snap(self, frame_time):
+        """frame_time rounded to a whole number of steps when it is only off by clock jitter"""
+        steps = round(frame_time / self.step)
+        if steps and abs(frame_time - steps * self.step) < self.snap_tolerance:
+            return steps * self.step
+        return frame_time
+
+    def getFps(self):
+        return self.clock.get_fps()
@@ -0,0 +1,66 @@
+import pygame
+from utils.profiler import profiler
+
+# characters of counters, scores and timers
+DEFAULT_CHARSET = " 0123456789/:.,-+%"
+
+class GlyphAtlas:
+    """the glyphs of one font and color rasterized once into a single surface
+
+    strings made only of those glyphs are composed by blitting sub-rects of the atlas at the
+    cached advances, the font isn't involved anymore. there is no kerning and pen positions are
+    whole pixels, so a glyph can sit a pixel away from where font.render would put it, which is
+    fine for counters and timers that change all the time"""
+
+    def __init__(self, font, color, charset=DEFAULT_CHARSET, antialias=True):
+        self.height = font.get_height()
+
+        characters = "".join(dict.fromkeys(charset))
+        rendered = []
+        for char, metrics in zip(characters, font.metrics(characters)):
+            if metrics is not None:
+                rendered.append((char, font.render(char, antialias, color), metrics))
+
+        profiler.count("surfaces_allocated")
+        self.surface = pygame.Surface((max(1, sum(s.get_width() for _, s, _ in rendered)), self.height), pygame.SRCALPHA)
+        self.surface.fill((0, 0, 0, 0))
+
+        self.glyphs = {}  # char -> (area in the atlas, x offset from the pen, advance)
+        x = 0
+        for char, glyph, (min_x, _, _, _, advance) in rendered:
+            # max keeps the glyph's own alpha instead of blending it with the transparent atlas
+            self.surface.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            # glyphs that reach left of the pen are rendered shifted right by that much
+            self.glyphs[char] = (pygame.Rect(x, 0, glyph.get_width(), glyph.get_height()), min(min_x, 0), advance)
+            x += glyph.get_width()
+
+    def canRender(self, text):
+        return bool(text) and all(char in self.glyphs for char in text)
+
+    def size(self, text):
+        return sum(self.glyphs[char][2] for char in text), self.height
+
+    def render(self, text):
+        """compose text on a new transparent surface"""
+        # a new surface comes zeroed, which is much cheaper than clearing an old one with fill()
+        profiler.count("surfaces_allocated")
+        target = pygame.Surface(self.size(text), pygame.SRCALPHA)
+
+        x = 0
+        for char in text:
+            area, offset, advance = self.glyphs[char]
+            target.blit(self.surface, (x + offset, 0), area, special_flags=pygame.BLEND_RGBA_MAX)
+            x += advance
+
+        profiler.count("atlas_renders")
+        return target
+
+# one atlas per font, color and antialiasing
+_atlases = {}
+
+def get_glyph_atlas(font, color, antialias=True):
+    key = (font, tuple(color), antialias)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(font, color, antialias=antialias)
+    return atlas
@@ -1,5 +1,5 @@
-import os
 import pygame
+from utils.profiler import profiler
 
 def load_image(image_path, convert_alpha=True, fallback_color=(255, 0, 255)):
 
@@ -17,40 +17,37 @@ def load_image(image_path, convert_alpha=True, fallback_color=(255, 0, 255)):
         surface.fill(fallback_color)
         return surface
 
-def preload_images_by_theme(themes_dict, base_path, placeholder_path=None):
-    image_cache = {}
-    theme_image_dict = {}
-    
-    # load placeholder image if provided
-    if placeholder_path and os.path.exists(placeholder_path):
-        placeholder = load_image(placeholder_path)
-        image_cache[placeholder_path] = placeholder
-    else:
-        # create a blank purple surface as default placeholder
-        placeholder = pygame.Surface((300, 200))
-        placeholder.fill((255, 0, 255))
-        
-    # set default theme with placeholder
-    theme_image_dict["default"] = [placeholder]
-    
-    # load all images from each theme folder
-    for theme, count in themes_dict.items():
-        theme_image_dict[theme] = []
-        for i in range(1, count + 1):
-            img_path = os.path.join(base_path, theme, f"{i}.jpg")
-            try:
-                img = load_image(img_path)
-                image_cache[img_path] = img
-                theme_image_dict[theme].append(img)
-            except Exception as e:
-                print(f"Error loading theme image {img_path}: {e}")
-                theme_image_dict[theme].append(placeholder)
-                
-    return image_cache, theme_image_dict
-
 def get_random_image_for_theme(theme_image_dict, theme):
     import random
     if theme in theme_image_dict and theme_image_dict[theme]:
         return random.choice(theme_image_dict[theme])
     # fallback to default theme
-    return random.choice(theme_image_dict["default"])
\ No newline at end of file
+    return random.choice(theme_image_dict["default"])
+
+def build_mip_chain(surface, min_size=16):
+    """build progressively halved copies of a surface, level 0 is the surface itself"""
+    levels = [surface]
+    
+    width, height = surface.get_size()
+    while width // 2 >= min_size and height // 2 >= min_size:
+        width, height = width // 2, height // 2
+        # each level is filtered from the previous one, so every step is a cheap 2:1 reduction
+        levels.append(pygame.transform.smoothscale(levels[-1], (width, height)))
+    
+    return levels
+
+def scale_from_mip_chain(levels, size):
+    """scale to size starting from the smallest level that is still at least as large"""
+    source = levels[0]
+    for level in levels:
+        if level.get_width() >= size[0] and level.get_height() >= size[1]:
+            source = level
+        else:
+            break
+    
+    if source.get_size() == size:
+        return source
+    
+    profiler.count("image_transforms")
+    profiler.count("surfaces_allocated")
+    return pygame.transform.smoothscale(source, size)
@@ -2,67 +2,154 @@ import os
 import json
 import datetime
 import statistics
+from config import LOG_FSYNC_EVERY, LOG_QUEUE_SIZE
+from utils.background_writer import BackgroundWriter
 
-def log_quiz_data(score, total_questions, question_times=None):
-    """log quiz data to a file named with the current day"""
+def get_logs_dir():
+    """directory the logs are written to, can be moved with the QUIZ_LOGS_DIR environment variable"""
+    return os.environ.get("QUIZ_LOGS_DIR") or os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logs")
+
+def session_log_path(day, logs_dir=None):
+    """the append-only log of one day (YYYY-MM-DD), one json line per session"""
+    return os.path.join(logs_dir or get_logs_dir(), f"{day}.jsonl")
+
+class SessionLog:
+    """appends session records to the log of the current day
+
+    every record is one json line written with a single append, so logging a session costs
+    the same however many sessions the day already has, and a crash loses at most the line
+    being written. fsync_every > 0 forces the log to disk after that many records"""
+
+    def __init__(self, logs_dir=None, fsync_every=0):
+        self.logs_dir = logs_dir
+        self.fsync_every = fsync_every
+        self.file = None
+        self.day = None
+        self.unsynced = 0
+
+    def _open(self, day):
+        if self.file is not None and self.day == day:
+            return self.file
+
+        self.close()
+        logs_dir = self.logs_dir or get_logs_dir()
+        if not os.path.exists(logs_dir):
+            os.makedirs(logs_dir)
+
+        path = session_log_path(day, logs_dir)
+        self.file = open(path, "a", encoding="utf-8")
+        self.day = day
+
+        # a crash can leave the last line unfinished, start on a fresh line so only that one is lost
+        if self.file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")
+        return self.file
+
+    def append(self, records, day=None):
+        """write records (dicts) to the log of day, today by default, returns the log path"""
+        day = day or datetime.datetime.now().strftime("%Y-%m-%d")
+        f = self._open(day)
+
+        # one write per batch, the file is opened for appending so lines never interleave
+        f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        f.flush()
+
+        self.unsynced += len(records)
+        if self.fsync_every and self.unsynced >= self.fsync_every:
+            self.sync()
+        return f.name
+
+    def sync(self):
+        if self.file is not None and self.unsynced:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+            self.day = None
 
-    # create logs directory if it doesn't exist
-    logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logs")
-    if not os.path.exists(logs_dir):
-        os.makedirs(logs_dir)
-    
-    # generate a date for the filename (YYYY-MM-DD)
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    log_file = os.path.join(logs_dir, f"{today}.json")
+def make_session_record(score, total_questions, question_times=None, now=None, session_id=None):
+    """the log line of a finished session"""
+    now = now or datetime.datetime.now()
 
     # calculate median time per question if data available
     time_per_question = None
     if question_times and len(question_times) > 0:
         time_per_question = statistics.median(question_times)
-    
-    # prepare log data for this session
-    log_data = {
-        "time": datetime.datetime.now().strftime("%H:%M:%S"),
+
+    return {
+        "time": now.strftime("%H:%M:%S"),
         "score": score,
-        "median_time_per_question": round(time_per_question, 3) if time_per_question is not None else None
+        "total_questions": total_questions,
+        "median_time_per_question": round(time_per_question, 3) if time_per_question is not None else None,
+        "session_id": session_id
     }
-    
-    # check if file already exists for today
+
+def read_sessions(day, logs_dir=None):
+    """the sessions logged on day (YYYY-MM-DD), including the older whole-file json logs"""
+    logs_dir = logs_dir or get_logs_dir()
+    sessions = []
+
+    legacy_file = os.path.join(logs_dir, f"{day}.json")
+    if os.path.exists(legacy_file):
+        try:
+            with open(legacy_file, "r") as f:
+                data = json.load(f)
+            sessions.extend(data if isinstance(data, list) else data.get("sessions", []))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"could not read {legacy_file}: {e}")
+
+    log_file = session_log_path(day, logs_dir)
     if os.path.exists(log_file):
-        # load existing data
-        with open(log_file, "r") as f:
-            try:
-                existing_data = json.load(f)
-            except json.JSONDecodeError:
-                existing_data = {"sessions_count": 0, "sessions": []}
-        
-        # add new session to existing data
-        if isinstance(existing_data, list):
-            existing_data = {
-                "sessions_count": len(existing_data),
-                "sessions": existing_data
-            }
-        
-        if "sessions" not in existing_data:
-            existing_data["sessions"] = []
-            
-        if "sessions_count" not in existing_data:
-            existing_data["sessions_count"] = len(existing_data.get("sessions", []))
-        
-        # add new session and increment count
-        existing_data["sessions"].append(log_data)
-        existing_data["sessions_count"] += 1
-        
-        # write updated data back to file
-        with open(log_file, "w") as f:
-            json.dump(existing_data, f, indent=4)
-    else:
-        # create new file with first session
-        new_data = {
-            "sessions_count": 1,
-            "sessions": [log_data]
-        }
-        with open(log_file, "w") as f:
-            json.dump(new_data, f, indent=4)
-    
-    print(f"Quiz data logged to {log_file}")
\ No newline at end of file
+        with open(log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    sessions.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # a line cut short by a crash, the rest of the log is still fine
+                    continue
+
+    return sessions
+
+def daily_summary(day=None, logs_dir=None):
+    """the day's sessions in the old daily log layout, built from the log on demand"""
+    day = day or datetime.datetime.now().strftime("%Y-%m-%d")
+    sessions = read_sessions(day, logs_dir)
+    return {
+        "sessions_count": len(sessions),
+        "sessions": sessions
+    }
+
+# log of this process, kept open between sessions
+session_log = SessionLog(fsync_every=LOG_FSYNC_EVERY)
+
+def _write_sessions(entries):
+    """writer thread side, entries are (day, record) pairs"""
+    records_by_day = {}
+    for day, record in entries:
+        records_by_day.setdefault(day, []).append(record)
+
+    for day, records in records_by_day.items():
+        log_file = session_log.append(records, day)
+        print(f"Quiz data logged to {log_file}")
+
+# sessions are written on their own thread, logging never waits for the disk
+log_writer = BackgroundWriter(_write_sessions, max_queue=LOG_QUEUE_SIZE, name="session-log")
+
+def log_quiz_data(score, total_questions, question_times=None, session_id=None):
+    """log quiz data to a file named with the current day"""
+    now = datetime.datetime.now()
+    record = make_session_record(score, total_questions, question_times, now, session_id)
+    # when the queue is full the session is dropped and counted, the count is reported on shutdown
+    log_writer.submit((now.strftime("%Y-%m-%d"), record))
+
+def shutdown_logging():
+    """write the queued sessions and close the log"""
+    if log_writer.stop():
+        session_log.close()
@@ -0,0 +1,117 @@
+import os
+import mmap
+import struct
+import hashlib
+import pygame
+
+# header: magic, width, height, pixel format (4 ascii characters)
+HEADER = struct.Struct("<4sII4s")
+MAGIC = b"QPX1"
+
+def display_pixel_format():
+    """the frombuffer format whose byte order matches the display, so converting is a plain copy"""
+    display = pygame.display.get_surface()
+    if display is not None and display.get_bitsize() == 32:
+        r_mask, g_mask, b_mask, _ = display.get_masks()
+        if (r_mask, g_mask, b_mask) == (0xff0000, 0xff00, 0xff):
+            return "BGRA" if struct.pack("=I", 1)[0] == 1 else "ARGB"
+    return "RGBA"
+
+class PixelCache:
+    """display-ready raw pixels of scaled images, stored on disk and memory mapped on load
+
+    entries are keyed by source path, modification time and target size, so editing or
+    replacing an image simply misses the cache, prune() then deletes the stale entry"""
+
+    def __init__(self, cache_dir, pixel_format="RGBA"):
+        self.cache_dir = cache_dir
+        self.pixel_format = pixel_format
+
+    def _entry_path(self, source_path, size):
+        stat = os.stat(source_path)
+        key = f"{os.path.abspath(source_path)}|{stat.st_mtime_ns}|{size[0]}x{size[1]}|{self.pixel_format}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".px")
+
+    def load(self, source_path, size):
+        """return the cached surface, or None when there is no valid entry"""
+        try:
+            entry_path = self._entry_path(source_path, size)
+            with open(entry_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(mapped) < HEADER.size:
+            # cut short, e.g. by a power loss right after it was written; rewritten on this miss
+            mapped.close()
+            return None
+
+        magic, width, height, pixel_format = HEADER.unpack_from(mapped)
+        expected_bytes = HEADER.size + width * height * 4
+        if magic != MAGIC or (width, height) != tuple(size) or len(mapped) != expected_bytes:
+            mapped.close()
+            return None
+
+        # the surface reads straight from the mapped file and keeps the mapping alive
+        pixels = memoryview(mapped)[HEADER.size:]
+        return pygame.image.frombuffer(pixels, (width, height), pixel_format.decode("ascii"))
+
+    def store(self, source_path, size, surface):
+        """write the pixels of an already scaled surface"""
+        try:
+            entry_path = self._entry_path(source_path, size)
+            if not os.path.exists(self.cache_dir):
+                os.makedirs(self.cache_dir, exist_ok=True)
+
+            header = HEADER.pack(MAGIC, size[0], size[1], self.pixel_format.encode("ascii"))
+            pixels = pygame.image.tobytes(surface, self.pixel_format)
+
+            # write to a temporary file first so a crash never leaves a truncated entry
+            temp_path = f"{entry_path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(header)
+                f.write(pixels)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            print(f"could not write pixel cache entry for {source_path}: {e}")
+
+    def prune(self, live_entries):
+        """delete every entry (and temporary file left by another process) that isn't one of the
+        (source path, size) pairs still in use, returns how many files were removed"""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        live = set()
+        for source_path, size in live_entries:
+            try:
+                live.add(os.path.basename(self._entry_path(source_path, size)))
+            except OSError:
+                continue
+
+        # this process's temporary files may be entries being written right now
+        own_temp_suffix = f".{os.getpid()}.tmp"
+
+        removed = 0
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name in live or not entry.name.endswith((".px", ".tmp")) or entry.name.endswith(own_temp_suffix):
+                    continue
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError as e:
+                    print(f"could not remove pixel cache entry {entry.name}: {e}")
+        return removed
+
+    def loadScaled(self, source_path, size):
+        """load an image at the given size, decoding and scaling it only on a cache miss"""
+        surface = self.load(source_path, size)
+        if surface is not None:
+            return surface
+
+        surface = pygame.image.load(source_path)
+        if surface.get_size() != tuple(size):
+            surface = pygame.transform.smoothscale(surface, size)
+
+        self.store(source_path, size, surface)
+        return surface
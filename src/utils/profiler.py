@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import datetime
+from collections import deque
+
+# QUIZ_PROFILE=1 turns the profiler on, QUIZ_PROFILE_OVERLAY=1 also draws it on screen
+PROFILE_ENV_VAR = "QUIZ_PROFILE"
+OVERLAY_ENV_VAR = "QUIZ_PROFILE_OVERLAY"
+OUTPUT_ENV_VAR = "QUIZ_PROFILE_OUTPUT"
+
+# how many recent frames the rolling statistics cover
+HISTORY_SIZE = 600
+
+# upper edges of the histogram buckets, in milliseconds
+HISTOGRAM_EDGES_MS = (0.5, 1, 2, 4, 8, 16.7, 33.3, 66.7)
+
+PHASES = ("handleEvents", "update", "draw", "flip")
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes", "on")
+
+def _percentile(sorted_samples, fraction):
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+class PhaseStats:
+    """rolling samples and a cumulative histogram of one phase of one state"""
+
+    def __init__(self, history_size):
+        self.recent = deque(maxlen=history_size)
+        self.buckets = [0] * (len(HISTOGRAM_EDGES_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, duration_ms):
+        self.recent.append(duration_ms)
+        self.count += 1
+        self.total += duration_ms
+
+        for i, edge in enumerate(HISTOGRAM_EDGES_MS):
+            if duration_ms <= edge:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def percentiles(self):
+        if not self.recent:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        ordered = sorted(self.recent)
+        return {
+            "p50": round(_percentile(ordered, 0.50), 4),
+            "p95": round(_percentile(ordered, 0.95), 4),
+            "p99": round(_percentile(ordered, 0.99), 4)
+        }
+
+    def toDict(self):
+        labels = [f"<={edge}" for edge in HISTOGRAM_EDGES_MS] + [f">{HISTOGRAM_EDGES_MS[-1]}"]
+        return {
+            "frames": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            **self.percentiles(),
+            "histogram_ms": dict(zip(labels, self.buckets))
+        }
+
+class FrameProfiler:
+    """per-state frame phase timings and counters for expensive work (text renders, image transforms...)"""
+
+    def __init__(self, enabled=False, overlay=False, frame_budget=1 / 60, history_size=HISTORY_SIZE):
+        self.enabled = enabled
+        self.overlay = overlay and enabled
+        self.frame_budget_ms = frame_budget * 1000.0
+        self.history_size = history_size
+
+        self.state = "none"
+        self.phases = {}
+        self.counters = {}
+        self.frame_ms = 0.0
+
+        self.overlay_font = None
+        self.overlay_size = (0, 0)
+
+    def setState(self, state_name):
+        self.state = state_name
+
+    def begin(self):
+        """start timing a phase, pass the result to end()"""
+        if not self.enabled:
+            return None
+        return time.perf_counter()
+
+    def end(self, phase, start):
+        """record the time spent in a phase since begin()"""
+        if start is None:
+            return
+        duration_ms = (time.perf_counter() - start) * 1000.0
+        self._phase(self.state, phase).add(duration_ms)
+        self.frame_ms += duration_ms
+
+    def endFrame(self):
+        """close the current frame and check it against the frame budget"""
+        if not self.enabled:
+            return
+        self._phase(self.state, "frame").add(self.frame_ms)
+        if self.frame_ms > self.frame_budget_ms:
+            self.count("frames_over_budget")
+        self.frame_ms = 0.0
+
+    def count(self, counter, amount=1):
+        """add to one of the work counters of the current state"""
+        if not self.enabled:
+            return
+        state_counters = self.counters.setdefault(self.state, {})
+        state_counters[counter] = state_counters.get(counter, 0) + amount
+
+    def _phase(self, state, phase):
+        state_phases = self.phases.setdefault(state, {})
+        stats = state_phases.get(phase)
+        if stats is None:
+            stats = state_phases[phase] = PhaseStats(self.history_size)
+        return stats
+
+    def report(self):
+        return {
+            "created": datetime.datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+            "frame_budget_ms": round(self.frame_budget_ms, 4),
+            "states": {
+                state: {
+                    "phases": {phase: stats.toDict() for phase, stats in phases.items()},
+                    "counters": dict(self.counters.get(state, {}))
+                }
+                for state, phases in self.phases.items()
+            }
+        }
+
+    def dump(self, path=None):
+        """write the collected statistics as json"""
+        if not self.enabled:
+            return None
+
+        if path is None:
+            path = os.environ.get(OUTPUT_ENV_VAR)
+        if path is None:
+            from utils.logger import get_logs_dir
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            path = os.path.join(get_logs_dir(), f"profile_{timestamp}.json")
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=4)
+
+        print(f"frame profile written to {path}")
+        return path
+
+    def drawOverlay(self, screen):
+        """draw the current state's statistics in the top left corner, returns the covered rect"""
+        if not self.overlay:
+            return None
+
+        import pygame
+        from utils.font_manager import get_font
+
+        if self.overlay_font is None:
+            self.overlay_font = get_font(18)
+
+        lines = [self.state]
+        for phase in (*PHASES, "frame"):
+            stats = self.phases.get(self.state, {}).get(phase)
+            if stats:
+                p = stats.percentiles()
+                lines.append(f"{phase}: p50 {p['p50']:.2f}  p95 {p['p95']:.2f}  p99 {p['p99']:.2f} ms")
+        for counter, value in sorted(self.counters.get(self.state, {}).items()):
+            lines.append(f"{counter}: {value}")
+
+        line_height = self.overlay_font.get_height()
+        surfaces = [self.overlay_font.render(line, True, (255, 255, 255)) for line in lines]
+        # never shrink, so the box always covers what it drew on earlier frames
+        self.overlay_size = (max(self.overlay_size[0], max(s.get_width() for s in surfaces) + 16),
+                             max(self.overlay_size[1], len(surfaces) * line_height + 16))
+        rect = pygame.Rect((0, 0), self.overlay_size)
+
+        pygame.draw.rect(screen, (0, 0, 0), rect)
+        for i, surface in enumerate(surfaces):
+            screen.blit(surface, (8, 8 + i * line_height))
+
+        return rect
+
+# process-wide profiler, configured from the environment
+profiler = FrameProfiler(enabled=_env_flag(PROFILE_ENV_VAR), overlay=_env_flag(OVERLAY_ENV_VAR))
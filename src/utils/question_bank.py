@@ -0,0 +1,292 @@
+"""compiled question bank
+
+the json bank is validated and normalized once and written as a compact binary file. the
+file has a fixed-width offset index over its records and is read through a memory map, so
+a session decodes only the questions it samples and memory stays flat as the bank grows
+
+usage: python src/utils/question_bank.py [questions.json] [output.qbank]
+"""
+import os
+import sys
+import mmap
+import array
+import struct
+from collections.abc import Sequence
+
+MAGIC = b"QBNK"
+VERSION = 5
+
+# magic, version, question count, theme count, source size, source mtime (ns); followed by the
+# charset, the u32 length and utf-8 of every character used by the texts and options
+HEADER = struct.Struct("<4sHIIQq")
+# id, answer index, theme number, option count
+RECORD = struct.Struct("<IBHB")
+STRING_LENGTH = struct.Struct("<H")
+COUNT = struct.Struct("<I")
+# file offset of a record, one per question right after the question ids
+OFFSET = struct.Struct("<Q")
+
+# QuizState has one answer button per option
+OPTION_COUNT = 4
+
+class QuestionBank:
+    """compiled questions, the positions of the questions of each theme and their stable ids
+
+    a question's id is its position in the json source, so it doesn't change when an earlier
+    question is fixed or turns invalid. new questions should be appended, removing one from the
+    json renumbers the ones after it"""
+
+    def __init__(self, questions, themes, ids, charset=""):
+        self.questions = questions  # sequence of normalized question dicts
+        self.themes = themes        # theme -> sequence of positions in questions
+        self.ids = ids              # position in questions -> question id, ascending
+        self.charset = charset      # sorted printable characters of every text and option, for font warm-up
+
+    def __len__(self):
+        return len(self.questions)
+
+def validate_question(question):
+    """problems that keep a raw json question out of the bank, empty if it is fine"""
+    problems = []
+
+    text = question.get("text", question.get("question"))
+    if not isinstance(text, str) or not text.strip():
+        problems.append("missing question text")
+
+    options = question.get("options")
+    if not isinstance(options, list) or not all(isinstance(o, str) for o in options):
+        problems.append("options must be a list of strings")
+        return problems
+    if len(options) != OPTION_COUNT:
+        # fewer would leave buttons without an option, more would hide options (maybe the answer)
+        problems.append(f"has {len(options)} options, the quiz shows exactly {OPTION_COUNT}")
+        return problems
+
+    if "answer_index" in question:
+        answer_index = question["answer_index"]
+    else:
+        answer = question.get("answer")
+        answer_index = int(answer) if isinstance(answer, str) and answer.isdigit() else None
+
+    if not isinstance(answer_index, int) or not 0 <= answer_index < len(options):
+        problems.append(f"answer must index one of the {len(options)} options")
+    elif options.count(options[answer_index]) > 1:
+        # options are matched by text when shuffled, so the correct one must be unique
+        problems.append("the correct option appears more than once")
+
+    return problems
+
+def compile_questions(raw_questions):
+    """validate and normalize raw json questions, returns a QuestionBank"""
+    from utils.quiz_utils import normalize_question_format
+
+    questions = []
+    themes = {}
+    ids = []
+    characters = set()
+
+    for position, raw in enumerate(raw_questions):
+        problems = validate_question(raw) if isinstance(raw, dict) else ["not an object"]
+        if problems:
+            print(f"skipping question {position}: {', '.join(problems)}")
+            continue
+
+        question = normalize_question_format(raw)
+        question["id"] = position
+        themes.setdefault(question["theme"], []).append(len(questions))
+        ids.append(position)
+        questions.append(question)
+
+        characters.update(question["text"])
+        for option in question["options"]:
+            characters.update(option)
+
+    charset = "".join(sorted(c for c in characters if c.isprintable()))
+    return QuestionBank(questions, themes, ids, charset)
+
+def _pack_string(text):
+    data = text.encode("utf-8")
+    if len(data) > 0xFFFF:
+        raise ValueError(f"text too long for the bank: {text[:40]}...")
+    return STRING_LENGTH.pack(len(data)) + data
+
+def _unpack_string(buffer, offset):
+    (length,) = STRING_LENGTH.unpack_from(buffer, offset)
+    offset += STRING_LENGTH.size
+    return buffer[offset:offset + length].decode("utf-8"), offset + length
+
+def write_bank(bank, path, source_stat=None):
+    """write the bank, source_stat is the os.stat of the json it was compiled from"""
+    theme_names = list(bank.themes)
+    theme_numbers = {name: number for number, name in enumerate(theme_names)}
+
+    parts = [HEADER.pack(MAGIC, VERSION, len(bank.questions), len(theme_names),
+                         source_stat.st_size if source_stat else 0,
+                         source_stat.st_mtime_ns if source_stat else 0)]
+
+    charset = bank.charset.encode("utf-8")
+    parts.append(COUNT.pack(len(charset)))
+    parts.append(charset)
+
+    # theme index
+    for name in theme_names:
+        positions = bank.themes[name]
+        parts.append(_pack_string(name))
+        parts.append(COUNT.pack(len(positions)))
+        parts.append(struct.pack(f"<{len(positions)}I", *positions))
+
+    parts.append(struct.pack(f"<{len(bank.ids)}I", *bank.ids))
+
+    # question records, encoded first so the offset index in front of them can be filled in
+    records = []
+    for question in bank.questions:
+        options = question["options"]
+        records.append(b"".join([
+            RECORD.pack(question["id"], question["answer_index"], theme_numbers[question["theme"]], len(options)),
+            _pack_string(question["text"]),
+            *(_pack_string(option) for option in options)
+        ]))
+
+    offset = sum(len(part) for part in parts) + len(records) * OFFSET.size
+    for record in records:
+        parts.append(OFFSET.pack(offset))
+        offset += len(record)
+    parts.extend(records)
+
+    # write next to the target first, so a crash never leaves half a bank behind
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(temp_path, path)
+
+class QuestionStore(Sequence):
+    """read-only sequence of the questions of a compiled bank, decoded from the mapped file on access"""
+
+    def __init__(self, buffer, index_offset, count, theme_names):
+        self.buffer = buffer
+        self.index_offset = index_offset
+        self.count = count
+        self.theme_names = theme_names
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("question index out of range")
+
+        (offset,) = OFFSET.unpack_from(self.buffer, self.index_offset + index * OFFSET.size)
+        return self._decode(offset)
+
+    def _decode(self, offset):
+        question_id, answer_index, theme_number, option_count = RECORD.unpack_from(self.buffer, offset)
+        offset += RECORD.size
+        text, offset = _unpack_string(self.buffer, offset)
+        options = []
+        for _ in range(option_count):
+            option, offset = _unpack_string(self.buffer, offset)
+            options.append(option)
+
+        return {
+            "id": question_id,
+            "text": text,
+            "options": options,
+            "answer_index": answer_index,
+            "theme": self.theme_names[theme_number]
+        }
+
+def _id_array(buffer, offset, count):
+    """a u32 array of the file (theme positions, question ids) as a sequence over the file itself
+    when the byte order allows it"""
+    if sys.byteorder == "little" and array.array("I").itemsize == 4:
+        return memoryview(buffer)[offset:offset + 4 * count].cast("I")
+    return array.array("I", struct.unpack_from(f"<{count}I", buffer, offset))
+
+def read_bank(path, source_stat=None):
+    """map a compiled bank, None if it is missing, corrupt or older than source_stat"""
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, question_count, theme_count, source_size, source_mtime = HEADER.unpack_from(buffer)
+    except (OSError, ValueError, struct.error):
+        return None
+
+    if magic != MAGIC or version != VERSION:
+        return None
+    if source_stat is not None and (source_size, source_mtime) != (source_stat.st_size, source_stat.st_mtime_ns):
+        return None
+
+    try:
+        (charset_length,) = COUNT.unpack_from(buffer, HEADER.size)
+        offset = HEADER.size + COUNT.size
+        if offset + charset_length > len(buffer):
+            raise ValueError("charset is truncated")
+        charset = buffer[offset:offset + charset_length].decode("utf-8")
+        offset += charset_length
+
+        theme_names = []
+        themes = {}
+        for _ in range(theme_count):
+            name, offset = _unpack_string(buffer, offset)
+            (count,) = COUNT.unpack_from(buffer, offset)
+            offset += COUNT.size
+            themes[name] = _id_array(buffer, offset, count)
+            offset += 4 * count
+            theme_names.append(name)
+
+        if offset + question_count * (4 + OFFSET.size) > len(buffer):
+            raise ValueError("question ids or offset index are truncated")
+        ids = _id_array(buffer, offset, question_count)
+        offset += 4 * question_count
+    except (struct.error, ValueError, UnicodeDecodeError) as e:
+        print(f"question bank {path} is corrupt: {e}")
+        return None
+
+    return QuestionBank(QuestionStore(buffer, offset, question_count, theme_names), themes, ids, charset)
+
+def load_question_bank(bank_path, source_path):
+    """the compiled bank, recompiled from the json source when it changed"""
+    from utils.file_utils import load_json_file
+
+    try:
+        source_stat = os.stat(source_path)
+    except OSError:
+        # no source to compare against, use whatever was compiled
+        return read_bank(bank_path)
+
+    bank = read_bank(bank_path, source_stat)
+    if bank is not None:
+        return bank
+
+    data = load_json_file(source_path)
+    if not data:
+        return None
+
+    bank = compile_questions(data.get("questions", []))
+    try:
+        write_bank(bank, bank_path, source_stat)
+        print(f"compiled {len(bank)} questions into {bank_path}")
+    except (OSError, ValueError) as e:
+        print(f"could not write question bank {bank_path}: {e}")
+    return bank
+
+if __name__ == "__main__":
+    # run from anywhere, paths default to the project's
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.path.join(project_root, "src"))
+    from utils.file_utils import load_json_file
+
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(project_root, "data", "questions.json")
+    output = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(source)[0] + ".qbank"
+
+    data = load_json_file(source)
+    if not data:
+        sys.exit(1)
+
+    compiled = compile_questions(data.get("questions", []))
+    write_bank(compiled, output, os.stat(source))
+    print(f"compiled {len(compiled)} questions in {len(compiled.themes)} themes into {output}")
@@ -0,0 +1,120 @@
+import os
+import array
+import random
+import struct
+
+from utils.logger import get_logs_dir
+from utils.background_writer import BackgroundWriter
+
+SEEN_FILENAME = "seen_questions.bin"
+
+# magic, version, size of the id space; the bitset follows
+HEADER = struct.Struct("<4sHI")
+MAGIC = b"QSEN"
+VERSION = 2
+
+class QuestionScheduler:
+    """serves questions that weren't shown yet, across sessions
+
+    pools and picks work with positions in the bank, the bitset that is saved beside the logs
+    has one bit per question id, so it survives questions being fixed or invalidated. each
+    pool (a theme, or the whole bank) keeps an array of its unseen positions and picks by
+    swapping a random entry with the last one, so a pick is O(1) however full the bitset gets.
+    when a pool runs out its bits are cleared and it starts over"""
+
+    def __init__(self, question_ids, path=None):
+        self.question_ids = question_ids  # position -> question id, ascending
+        self.id_count = question_ids[-1] + 1 if len(question_ids) else 0
+        self.path = path or os.path.join(get_logs_dir(), SEEN_FILENAME)
+        self.seen = self._load()
+        self.pools = {}  # pool name -> array of unseen positions
+
+        # snapshots are written on their own thread, sessions start on the render thread
+        self.writer = BackgroundWriter(self._write_snapshots, max_queue=8, batch_size=8, name="seen-questions")
+
+    def isSeen(self, position):
+        question_id = self.question_ids[position]
+        return bool(self.seen[question_id >> 3] & (1 << (question_id & 7)))
+
+    def _mark(self, position):
+        question_id = self.question_ids[position]
+        self.seen[question_id >> 3] |= 1 << (question_id & 7)
+
+    def _unmark(self, position):
+        question_id = self.question_ids[position]
+        self.seen[question_id >> 3] &= ~(1 << (question_id & 7)) & 0xFF
+
+    def preparePools(self, pools):
+        """build the unseen arrays up front (pool name -> positions), so the first pick doesn't have to"""
+        for name, positions in pools.items():
+            self._pool(name, positions)
+
+    def _pool(self, name, positions):
+        unseen = self.pools.get(name)
+        if unseen is None:
+            unseen = self.pools[name] = array.array("I", [i for i in positions if not self.isSeen(i)])
+        return unseen
+
+    def pick(self, name, positions, count):
+        """take count unseen positions of a pool and mark them as seen"""
+        count = min(count, len(positions))
+        unseen = self._pool(name, positions)
+        picked = []
+
+        while len(picked) < count:
+            if not unseen:
+                # the whole pool was served, start over without repeating this session's picks
+                for position in positions:
+                    self._unmark(position)
+                for position in picked:
+                    self._mark(position)
+                unseen = self.pools[name] = array.array("I", [i for i in positions if not self.isSeen(i)])
+
+            index = random.randrange(len(unseen))
+            position = unseen[index]
+            unseen[index] = unseen[-1]
+            unseen.pop()
+
+            self._mark(position)
+            picked.append(position)
+
+        return picked
+
+    def _load(self):
+        size = (self.id_count + 7) // 8
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            magic, version, _ = HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return bytearray(size)
+
+        if magic != MAGIC or version != VERSION:
+            return bytearray(size)
+
+        # ids only grow as questions are appended to the bank, so old bits stay valid
+        seen = bytearray(data[HEADER.size:HEADER.size + size])
+        seen.extend(bytes(size - len(seen)))
+        if self.id_count % 8:
+            seen[-1] &= (1 << (self.id_count % 8)) - 1
+        return seen
+
+    def save(self):
+        """queue a snapshot of the bitset for writing (never blocks)"""
+        self.writer.submit(bytes(self.seen))
+
+    def stop(self):
+        """write the queued snapshot"""
+        self.writer.stop()
+
+    def _write_snapshots(self, snapshots):
+        # every snapshot holds the whole set, only the newest one matters
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.id_count))
+            f.write(snapshots[-1])
+        os.replace(temp_path, self.path)
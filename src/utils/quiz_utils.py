@@ -1,6 +1,7 @@
 import random
 
-def select_random_questions(all_questions, count=20, shuffle_options=True):
+def select_random_questions(all_questions, count=20, shuffle_options=True, normalize=True):
+    """normalize can be turned off for questions from a compiled bank, they already are"""
     if not all_questions:
         return []
         
@@ -8,20 +9,77 @@ def select_random_questions(all_questions, count=20, shuffle_options=True):
     if len(all_questions) > count:
         selected = random.sample(all_questions, count)
     else:
-        # shuffle a copy of all_questions
-        selected = all_questions.copy()
+        # shuffle a copy of all_questions (a list or a question store)
+        selected = list(all_questions)
         random.shuffle(selected)
     
     # normalize all question structures to ensure consistent keys
     normalized = []
     for q in selected:
-        normalized_q = normalize_question_format(q)
+        # always a copy, the session adds its own keys (image...) to the questions
+        normalized_q = normalize_question_format(q) if normalize else dict(q)
         if shuffle_options:
             normalized_q = shuffle_question_options(normalized_q)
         normalized.append(normalized_q)
         
     return normalized
 
+def allocate_theme_quotas(theme_sizes, count):
+    """split count as evenly as possible over the themes, never asking a theme for more than it has
+
+    themes that run out hand their share to the others, the remainder goes to random themes"""
+    quotas = {theme: 0 for theme in theme_sizes}
+    themes = [theme for theme, size in theme_sizes.items() if size > 0]
+    random.shuffle(themes)
+    remaining = min(count, sum(theme_sizes[theme] for theme in themes))
+
+    while remaining > 0 and themes:
+        share, extra = divmod(remaining, len(themes))
+        still_available = []
+        for i, theme in enumerate(themes):
+            take = min(share + (1 if i < extra else 0), theme_sizes[theme] - quotas[theme])
+            quotas[theme] += take
+            remaining -= take
+            if quotas[theme] < theme_sizes[theme]:
+                still_available.append(theme)
+        themes = still_available
+
+    return quotas
+
+def select_stratified_questions(all_questions, theme_index, count=20, quotas=None,
+                                shuffle_options=True, normalize=True, pick=None):
+    """pick questions per theme from theme_index (theme -> positions in all_questions)
+
+    without quotas the count is balanced across the themes, with quotas (theme -> count) each theme
+    gives exactly that many, or all it has. only the chosen questions are touched, so the cost
+    depends on count and not on the size of the bank
+
+    pick(theme, positions, count) chooses the positions of a theme, a random sample by default"""
+    if quotas is None:
+        quotas = allocate_theme_quotas({theme: len(positions) for theme, positions in theme_index.items()}, count)
+
+    selected_positions = []
+    for theme, quota in quotas.items():
+        positions = theme_index.get(theme, ())
+        if quota > 0 and positions:
+            if pick is None:
+                selected_positions.extend(random.sample(positions, min(quota, len(positions))))
+            else:
+                selected_positions.extend(pick(theme, positions, min(quota, len(positions))))
+
+    # mix the themes, otherwise they would come in blocks
+    random.shuffle(selected_positions)
+
+    selected = []
+    for position in selected_positions:
+        question = all_questions[position]
+        question = normalize_question_format(question) if normalize else dict(question)
+        if shuffle_options:
+            question = shuffle_question_options(question)
+        selected.append(question)
+
+    return selected
+
 def normalize_question_format(question):
     # create a new dictionary with required keys
     normalized = {}
@@ -62,6 +120,8 @@ def shuffle_question_options(question):
     random.shuffle(pairs)
     
     question['options'] = [option for _, option in pairs]
+    # original position of the option shown in each slot
+    question['option_order'] = [index for index, _ in pairs]
     
     for i, option in enumerate(question['options']):
         if option == correct_answer:
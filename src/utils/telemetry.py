@@ -0,0 +1,195 @@
+"""per-answer telemetry
+
+every answer becomes one row of fixed-width columns. each day has a folder under
+logs/telemetry/ with one raw file per column and a schema.json with the numpy dtype of
+every column and the theme names, so the columns can be memory mapped and aggregated
+directly (see load_telemetry). a row takes 27 bytes
+
+the columns are appended one after the other, a crash in between leaves some of them longer.
+every append first cuts all of them back to the rows they have in common, so row i stays the
+same answer in every column
+"""
+import os
+import sys
+import json
+import time
+import array
+
+from config import TELEMETRY_ENABLED, TELEMETRY_QUEUE_SIZE
+from utils.logger import get_logs_dir
+from utils.background_writer import BackgroundWriter
+
+SCHEMA_FILENAME = "schema.json"
+SCHEMA_VERSION = 1
+
+MAX_OPTIONS = 4
+
+# question_id of questions that aren't from the bank (the fallback question)
+NO_QUESTION_ID = 0xFFFFFFFF
+# chosen_index when the time ran out
+TIMED_OUT = -1
+# option_order padding when a question has less than MAX_OPTIONS options
+NO_OPTION = 0xFF
+
+# name, array typecode, values per row
+COLUMNS = (
+    ("timestamp", "I", 1),         # unix time of the answer, in seconds
+    ("session_id", "Q", 1),
+    ("question_id", "I", 1),
+    ("theme", "B", 1),             # position in the schema's theme list
+    ("option_order", "B", MAX_OPTIONS),  # bank option index shown on each button
+    ("chosen_index", "b", 1),      # button pressed, TIMED_OUT if none
+    ("correct", "B", 1),
+    ("response_time", "f", 1)      # seconds
+)
+
+# array typecode -> numpy dtype kind and size
+_DTYPES = {"I": "u4", "Q": "u8", "B": "u1", "b": "i1", "f": "f4"}
+
+def _row_size(typecode, width):
+    """bytes of one row of a column"""
+    return array.array(typecode).itemsize * width
+
+def _numpy_dtype(typecode):
+    byte_order = "<" if sys.byteorder == "little" else ">"
+    return byte_order + _DTYPES[typecode]
+
+def new_session_id():
+    """random 63 bit id, random enough to tell the sessions of several kiosks apart"""
+    return int.from_bytes(os.urandom(8), "little") >> 1
+
+class TelemetryStore:
+    """appends answer rows to the column files of their day"""
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir
+        self.themes = {}  # day folder -> theme names, as in its schema
+
+    def _day_dir(self, day):
+        return os.path.join(self.base_dir or os.path.join(get_logs_dir(), "telemetry"), day)
+
+    def _day_themes(self, day_dir):
+        themes = self.themes.get(day_dir)
+        if themes is None:
+            try:
+                with open(os.path.join(day_dir, SCHEMA_FILENAME), "r", encoding="utf-8") as f:
+                    themes = json.load(f).get("themes", [])
+            except (OSError, ValueError):
+                themes = []
+            self.themes[day_dir] = themes
+        return themes
+
+    def _write_schema(self, day_dir, themes):
+        schema = {
+            "version": SCHEMA_VERSION,
+            "columns": [{"name": name, "dtype": _numpy_dtype(typecode), "shape": [width] if width > 1 else []}
+                        for name, typecode, width in COLUMNS],
+            "themes": themes
+        }
+        temp_path = os.path.join(day_dir, f"{SCHEMA_FILENAME}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(schema, f, indent=4)
+        os.replace(temp_path, os.path.join(day_dir, SCHEMA_FILENAME))
+
+    def append(self, events):
+        """write events, tuples of (timestamp, session_id, question_id, theme name, option_order,
+        chosen_index, correct, response_time)"""
+        events_by_day = {}
+        for event in events:
+            day = time.strftime("%Y-%m-%d", time.localtime(event[0]))
+            events_by_day.setdefault(day, []).append(event)
+
+        for day, day_events in events_by_day.items():
+            self._append_day(self._day_dir(day), day_events)
+
+    def _append_day(self, day_dir, events):
+        if not os.path.exists(day_dir):
+            os.makedirs(day_dir)
+
+        themes = self._day_themes(day_dir)
+        theme_count = len(themes)
+        theme_codes = {name: code for code, name in enumerate(themes)}
+
+        columns = [array.array(typecode) for _, typecode, _ in COLUMNS]
+        timestamps, session_ids, question_ids, theme_column, option_orders, chosen, correct, times = columns
+
+        for timestamp, session_id, question_id, theme, option_order, chosen_index, is_correct, response_time in events:
+            if theme not in theme_codes:
+                theme_codes[theme] = len(themes)
+                themes.append(theme)
+
+            timestamps.append(int(timestamp))
+            session_ids.append(session_id)
+            question_ids.append(question_id)
+            theme_column.append(theme_codes[theme])
+            option_orders.extend((list(option_order) + [NO_OPTION] * MAX_OPTIONS)[:MAX_OPTIONS])
+            chosen.append(chosen_index)
+            correct.append(1 if is_correct else 0)
+            times.append(response_time)
+
+        # the schema comes first, so every written theme code can be resolved
+        if len(themes) != theme_count or not os.path.exists(os.path.join(day_dir, SCHEMA_FILENAME)):
+            self._write_schema(day_dir, themes)
+
+        self._drop_partial_rows(day_dir)
+        for (name, _, _), column in zip(COLUMNS, columns):
+            with open(os.path.join(day_dir, f"{name}.bin"), "ab") as f:
+                column.tofile(f)
+
+    def _drop_partial_rows(self, day_dir):
+        """cut every column file back to the rows all of them have"""
+        paths = [os.path.join(day_dir, f"{name}.bin") for name, _, _ in COLUMNS]
+        sizes = [os.path.getsize(path) if os.path.exists(path) else 0 for path in paths]
+        row_sizes = [_row_size(typecode, width) for _, typecode, width in COLUMNS]
+
+        rows = min(size // row_size for size, row_size in zip(sizes, row_sizes))
+        for path, size, row_size in zip(paths, sizes, row_sizes):
+            if size > rows * row_size:
+                os.truncate(path, rows * row_size)
+
+def load_telemetry(day_dir):
+    """column name -> read-only numpy memmap of one day, plus "themes" (needs numpy)
+
+    a crash between column writes leaves some columns longer until the next append cuts them
+    back, the extra rows at their end are left out here"""
+    import numpy as np
+
+    with open(os.path.join(day_dir, SCHEMA_FILENAME), "r", encoding="utf-8") as f:
+        schema = json.load(f)
+
+    columns = {}
+    for column in schema["columns"]:
+        dtype = np.dtype((column["dtype"], tuple(column["shape"]))) if column["shape"] else np.dtype(column["dtype"])
+        path = os.path.join(day_dir, f"{column['name']}.bin")
+        rows = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        columns[column["name"]] = np.memmap(path, dtype=dtype, mode="r", shape=(rows,)) if rows else np.empty(0, dtype)
+
+    rows = min(len(values) for values in columns.values())
+    telemetry = {name: values[:rows] for name, values in columns.items()}
+    telemetry["themes"] = schema["themes"]
+    return telemetry
+
+# answers are written on their own thread, like the session log
+telemetry_writer = BackgroundWriter(TelemetryStore().append, max_queue=TELEMETRY_QUEUE_SIZE,
+                                    batch_size=256, name="telemetry")
+
+def record_answer(session_id, question, chosen_index, correct, response_time):
+    """queue one answer, chosen_index is TIMED_OUT when the time ran out"""
+    if not TELEMETRY_ENABLED:
+        return
+
+    option_order = question.get("option_order") or range(len(question["options"]))
+    telemetry_writer.submit((
+        time.time(),
+        session_id,
+        question.get("id", NO_QUESTION_ID),
+        question.get("theme", "default"),
+        tuple(option_order),
+        chosen_index,
+        correct,
+        response_time
+    ))
+
+def shutdown_telemetry():
+    """write the queued answers"""
+    telemetry_writer.stop()
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from utils.text_layout import layout_text
+
+# upper bound for the memory held by cached text surfaces
+TEXT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+class TextRenderCache:
+    """lru cache of rendered text blocks shared by every label and button"""
+
+    def __init__(self, max_bytes=TEXT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True, wrap_width=None):
+        """return a surface with the text rendered (and wrapped) as a centered block
+
+        the returned surface is shared, callers must copy it before changing it"""
+        # the font object carries its file and size
+        key = (font, text, tuple(color), antialias, wrap_width)
+
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = _render_block(font, text, color, antialias, wrap_width)
+        self._store(key, surface)
+        return surface
+
+    def _store(self, key, surface):
+        size = surface.get_pitch() * surface.get_height()
+        if size > self.max_bytes:
+            return
+
+        self.entries[key] = surface
+        self.size_bytes += size
+
+        # evict the least recently used surfaces until we are back under budget
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size_bytes -= evicted.get_pitch() * evicted.get_height()
+
+    def clear(self):
+        self.entries.clear()
+        self.size_bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+def _render_block(font, text, color, antialias, wrap_width):
+    return layout_text(font, text, wrap_width).render(font, color, antialias)
+
+# process-wide cache instance
+text_cache = TextRenderCache()
+
+def render_text(font, text, color, antialias=True, wrap_width=None):
+    """render text through the shared cache"""
+    return text_cache.render(font, text, color, antialias, wrap_width)
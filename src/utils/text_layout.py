@@ -0,0 +1,127 @@
+import pygame
+from collections import OrderedDict
+from utils.profiler import profiler
+
+# how many layouts and measured words are kept around
+LAYOUT_CACHE_SIZE = 256
+WORD_CACHE_SIZE = 4096
+
+class TextLayout:
+    """the lines of a text block and their measured widths, independent of color"""
+
+    def __init__(self, lines, line_widths, line_height):
+        self.lines = lines
+        self.line_widths = line_widths
+        self.line_height = line_height
+
+        self.width = max(line_widths) if line_widths else 0
+        self.height = len(lines) * line_height
+
+    def render(self, font, color, antialias=True):
+        """render the block, each line is rendered exactly once and centered horizontally"""
+        profiler.count("text_renders", len(self.lines))
+
+        if len(self.lines) == 1:
+            profiler.count("surfaces_allocated")
+            return font.render(self.lines[0], antialias, color)
+
+        profiler.count("surfaces_allocated", len(self.lines) + 1)
+        block = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        block.fill((0, 0, 0, 0))
+
+        for i, line in enumerate(self.lines):
+            line_surface = font.render(line, antialias, color)
+            block.blit(line_surface, line_surface.get_rect(midtop=(self.width // 2, i * self.line_height)))
+
+        return block
+
+class _LruDict(OrderedDict):
+    def __init__(self, max_entries):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def put(self, key, value):
+        self[key] = value
+        if len(self) > self.max_entries:
+            self.popitem(last=False)
+
+_layout_cache = _LruDict(LAYOUT_CACHE_SIZE)
+_word_widths = _LruDict(WORD_CACHE_SIZE)
+
+def _word_width(font, word):
+    key = (font, word)
+    width = _word_widths.get(key)
+    if width is None:
+        width = font.size(word)[0]
+        _word_widths.put(key, width)
+    return width
+
+def _wrap(font, text, wrap_width):
+    """greedy word wrap measured with font metrics, no surfaces are rendered"""
+    space_width = _word_width(font, " ")
+
+    lines = []
+    line_widths = []
+    current_words = []
+    current_width = 0
+
+    for word in text.split():
+        word_width = _word_width(font, word)
+
+        if not current_words:
+            # a word wider than the line still gets a line of its own
+            current_words = [word]
+            current_width = word_width
+            continue
+
+        # summed word widths are off by a few pixels of kerning at most
+        estimate = current_width + space_width + word_width
+        if estimate + space_width <= wrap_width:
+            fits = True
+        elif estimate - space_width > wrap_width:
+            fits = False
+        else:
+            # too close to call from the cached widths, measure the whole line
+            fits = font.size(" ".join(current_words + [word]))[0] <= wrap_width
+
+        if fits:
+            current_words.append(word)
+            current_width = estimate
+        else:
+            line = " ".join(current_words)
+            lines.append(line)
+            line_widths.append(font.size(line)[0])
+
+            current_words = [word]
+            current_width = word_width
+
+    if current_words:
+        line = " ".join(current_words)
+        lines.append(line)
+        line_widths.append(font.size(line)[0])
+
+    return lines, line_widths
+
+def layout_text(font, text, wrap_width=None):
+    """measure and wrap text into a reusable layout"""
+    key = (font, text, wrap_width)
+    layout = _layout_cache.get(key)
+    if layout is not None:
+        return layout
+
+    lines, line_widths = ([], []) if wrap_width is None else _wrap(font, text, wrap_width)
+
+    # no wrapping needed or nothing to wrap, keep the text on a single line
+    if not lines:
+        lines = [text]
+        line_widths = [font.size(text)[0]]
+
+    layout = TextLayout(lines, line_widths, font.get_height())
+    _layout_cache.put(key, layout)
+    return layout
@@ -0,0 +1,129 @@
+import pygame
+import weakref
+from collections import OrderedDict
+from utils.profiler import profiler
+
+# upper bound for the memory held by scaled images and corner masks
+TRANSFORM_CACHE_MAX_BYTES = 48 * 1024 * 1024
+
+def _surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+class TransformCache:
+    """lru cache of scaled and rounded image variants, bounded by surface memory"""
+
+    def __init__(self, max_bytes=TRANSFORM_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def transform(self, source, size, border_radius=0):
+        """return source scaled to size with rounded corners
+
+        the returned surface is shared, callers must copy it before changing it"""
+        # sources are only referenced weakly, the cache must not keep evicted images alive
+        key = ("image", id(source), size, border_radius)
+
+        entry = self._lookup(key)
+        if entry is not None:
+            source_ref, surface = entry
+            if source_ref() is source:
+                return surface
+            # the id belonged to a surface that no longer exists
+            self._remove(key)
+
+        if size is None or size == source.get_size():
+            if border_radius <= 0:
+                # nothing to do, no point in caching the source itself
+                return source
+            surface = source
+        else:
+            profiler.count("image_transforms")
+            profiler.count("surfaces_allocated")
+            surface = pygame.transform.smoothscale(source, size)
+
+        if border_radius > 0:
+            surface = self._round_corners(surface, border_radius)
+
+        self._store(key, (weakref.ref(source), surface))
+        return surface
+
+    def rounded_mask(self, size, border_radius):
+        """return a white mask with rounded corners for the given size"""
+        key = ("mask", size, border_radius)
+
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[1]
+
+        w, h = size
+        radius = min(border_radius, min(w, h) // 2)  # limit radius to half of smallest dimension
+
+        # create a mask surface with rounded corners
+        profiler.count("surfaces_allocated")
+        mask = pygame.Surface((w, h), pygame.SRCALPHA)
+        mask.fill((0, 0, 0, 0))  # transparent
+        pygame.draw.rect(mask, (255, 255, 255, 255), (0, 0, w, h), border_radius=radius)
+
+        self._store(key, (None, mask))
+        return mask
+
+    def _round_corners(self, surface, border_radius):
+        # create a copy with per-pixel alpha
+        profiler.count("image_transforms")
+        profiler.count("surfaces_allocated")
+        rounded = surface.copy()
+        if rounded.get_alpha() is None:
+            rounded = rounded.convert_alpha()
+
+        # apply the mask to the image
+        rounded.blit(self.rounded_mask(rounded.get_size(), border_radius), (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
+        return rounded
+
+    def _lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def _store(self, key, entry):
+        size = _surface_bytes(entry[1])
+        if size > self.max_bytes:
+            return
+
+        self.entries[key] = entry
+        self.size_bytes += size
+
+        # evict the least recently used surfaces until we are back under budget
+        while self.size_bytes > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size_bytes -= _surface_bytes(evicted)
+
+    def _remove(self, key):
+        _, surface = self.entries.pop(key)
+        self.size_bytes -= _surface_bytes(surface)
+
+    def clear(self):
+        self.entries.clear()
+        self.size_bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+# process-wide cache instance
+transform_cache = TransformCache()
+
+def transform_image(source, size, border_radius=0):
+    """scale and round an image through the shared cache"""
+    return transform_cache.transform(source, size, border_radius)